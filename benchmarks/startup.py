@@ -0,0 +1,160 @@
+"""
+Cold-start benchmark for every invoke-presets subcommand.
+
+Each invocation runs in a fresh interpreter with `python -X importtime` and
+reports the wall time, the total time spent importing and whether any of the
+heavy optional modules were pulled in.
+
+Usage:
+$ python benchmarks/startup.py
+$ python benchmarks/startup.py --runs 10 --json startup.json --budget-ms 250
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from typing import List, Dict, Any
+
+from rich.console import Console
+from rich.table import Table
+
+HEAVY_MODULES = [
+    "invokeai_presets_cli.functions",
+    "inquirer",
+    "httpx",
+    "dotenv",
+    "rich.markdown",
+]
+
+# Commands that are safe to actually run against a configured install
+READ_ONLY_RUNS = [
+    ["about", "--version"],
+    ["database", "list-snapshots"],
+    ["list", "--all"],
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+console = Console()
+
+
+def collect_commands() -> List[List[str]]:
+    import typer
+
+    from invokeai_presets_cli.cli import invoke_presets_cli
+
+    commands = [[]]
+
+    def walk(group: Any, path: List[str]) -> None:
+        for name, command in sorted(group.commands.items()):
+            commands.append(path + [name])
+            if hasattr(command, "commands"):
+                walk(command, path + [name])
+
+    walk(typer.main.get_command(invoke_presets_cli), [])
+    return commands
+
+
+def parse_importtime(stderr: str) -> Dict[str, Any]:
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        modules.add(module.strip())
+        # Top level imports carry no indentation, their cumulative time
+        # already includes everything they pulled in
+        if not module.startswith("  "):
+            total_us += int(cumulative)
+    return {
+        "import_ms": total_us / 1000,
+        "heavy": [module for module in HEAVY_MODULES if module in modules],
+    }
+
+
+def measure(args: List[str], runs: int) -> Dict[str, Any]:
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "invokeai_presets_cli", *args],
+            input="q\n",
+            capture_output=True,
+            text=True,
+            env={**os.environ, "COLUMNS": "120", "PYTHONPATH": REPO_ROOT},
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        result = {"wall_ms": wall_ms, **parse_importtime(process.stderr)}
+        result["exit_code"] = process.returncode
+        if best is None or wall_ms < best["wall_ms"]:
+            best = result
+    best["command"] = " ".join(args) or "(root)"
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Exit non-zero when a --help invocation exceeds this wall time",
+    )
+    parser.add_argument(
+        "--skip-runs",
+        action="store_true",
+        help="Only time --help, do not run the read-only commands",
+    )
+    options = parser.parse_args()
+
+    invocations = [command + ["--help"] for command in collect_commands()]
+    if not options.skip_runs:
+        invocations += READ_ONLY_RUNS
+
+    results = [measure(args, options.runs) for args in invocations]
+
+    table = Table(title="Cold start", title_justify="left")
+    for column, style in [
+        ("Command", "white"),
+        ("Wall (ms)", "yellow"),
+        ("Imports (ms)", "yellow"),
+        ("Heavy modules", "red"),
+    ]:
+        table.add_column(column, style=style)
+    for result in results:
+        table.add_row(
+            result["command"],
+            f"{result['wall_ms']:.0f}",
+            f"{result['import_ms']:.0f}",
+            ", ".join(result["heavy"]) or "-",
+        )
+    console.print(table)
+
+    if options.json_path:
+        with open(options.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if options.budget_ms:
+        over = [
+            result
+            for result in results
+            if result["command"].endswith("--help")
+            and result["wall_ms"] > options.budget_ms
+        ]
+        for result in over:
+            console.print(
+                f"[bold red]{result['command']}:[/bold red] {result['wall_ms']:.0f}ms exceeds {options.budget_ms:.0f}ms"
+            )
+        return 1 if over else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
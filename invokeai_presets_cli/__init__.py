@@ -1,20 +1,15 @@
 import os
-import inquirer
-import typer
 import platform
-import tempfile
 
 from pathlib import Path
-from typing import Final
-from dotenv import load_dotenv, set_key
-from rich.console import Console
-
-from .helpers import feedback_message
-
-console = Console()
+from functools import lru_cache
+from typing import Dict
 
 
 def get_required_input(prompt: str) -> str:
+    import inquirer
+    from .helpers import feedback_message
+
     while True:
         questions = [
             inquirer.Text(
@@ -28,6 +23,8 @@ def get_required_input(prompt: str) -> str:
 
 
 def validate_directory(path: str) -> str:
+    from .helpers import feedback_message
+
     dir_path = Path(path).expanduser().resolve()
     if not dir_path.exists():
         try:
@@ -47,6 +44,9 @@ def validate_directory(path: str) -> str:
 
 
 def create_env_file(env_path: Path) -> None:
+    from dotenv import set_key
+    from .helpers import feedback_message
+
     feedback_message(f"Creating new .env file at {env_path}", "info")
 
     invokeai_dir = validate_directory(
@@ -84,6 +84,9 @@ def get_default_env_locations():
 
 
 def load_environment_variables() -> None:
+    from dotenv import load_dotenv
+    from .helpers import feedback_message
+
     env_locations = get_default_env_locations()
 
     env_path = None
@@ -104,6 +107,8 @@ def load_environment_variables() -> None:
         for path in env_locations:
             print(f"  - {Path(path).expanduser()}")
 
+        import inquirer
+
         create_new = inquirer.confirm(
             "Would you like to create a new .env file?", default=True
         )
@@ -145,18 +150,62 @@ def load_environment_variables() -> None:
         exit()
 
 
-# Load environment variables
-load_environment_variables()
-
-# Define constants
-INVOKE_AI_DIR: Final = os.environ["INVOKE_AI_DIR"]
-SNAPSHOTS: Final = os.environ["SNAPSHOTS"]
-
 PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-DATABASE_PATH = os.path.join(INVOKE_AI_DIR, "databases", "invokeai.db")
 SNAPSHOTS_DIR = os.path.join(PACKAGE_DIR, "snapshots")
 SNAPSHOTS_JSON = os.path.join(SNAPSHOTS_DIR, "snapshots.json")
+SNAPSHOTS_CATALOG = os.path.join(SNAPSHOTS_DIR, "snapshots.db")
+
+
+def get_cache_dir() -> str:
+    # Caches are rebuilt on demand, so they live in the per-user cache
+    # directory rather than next to the installed package
+    if platform.system() == "Windows":
+        base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "invokeai-presets-itsjustregi")
+
+
+CACHE_DIR = get_cache_dir()
+HTTP_CACHE_PATH = os.path.join(CACHE_DIR, "http_cache.db")
+SEARCH_INDEX_PATH = os.path.join(CACHE_DIR, "search_index.db")
+SIGNATURES_PATH = os.path.join(CACHE_DIR, "signatures.db")
+PRESET_HASHES_PATH = os.path.join(CACHE_DIR, "preset_hashes.db")
+SYNC_SCAN_PATH = os.path.join(CACHE_DIR, "sync_scan.db")
+
+# Settings that need the .env file are resolved the first time one of them is
+# imported, so commands that never touch the database start without it
+CONFIG_NAMES = (
+    "INVOKE_AI_DIR",
+    "SNAPSHOTS",
+    "SNAPSHOTS_HOURLY",
+    "SNAPSHOTS_DAILY",
+    "SNAPSHOTS_WEEKLY",
+    "DATABASE_PATH",
+)
+
+
+@lru_cache(maxsize=None)
+def load_config() -> Dict[str, str]:
+    load_environment_variables()
+    invoke_ai_dir = os.environ["INVOKE_AI_DIR"]
+    return {
+        "INVOKE_AI_DIR": invoke_ai_dir,
+        "SNAPSHOTS": os.environ["SNAPSHOTS"],
+        # Grandfather-father-son retention on top of the SNAPSHOTS most recent,
+        # off unless set so SNAPSHOTS alone still caps existing installs
+        "SNAPSHOTS_HOURLY": os.getenv("SNAPSHOTS_HOURLY", "0"),
+        "SNAPSHOTS_DAILY": os.getenv("SNAPSHOTS_DAILY", "0"),
+        "SNAPSHOTS_WEEKLY": os.getenv("SNAPSHOTS_WEEKLY", "0"),
+        "DATABASE_PATH": os.path.join(invoke_ai_dir, "databases", "invokeai.db"),
+    }
+
+
+def __getattr__(name: str) -> str:
+    if name in CONFIG_NAMES:
+        return load_config()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def create_snapshot_directory() -> bool:
@@ -171,6 +220,3 @@ def create_snapshot_directory() -> bool:
 
     except OSError as e:
         raise OSError(f"An error occurred while creating the snapshot directory: {e}")
-
-
-create_snapshot_directory()
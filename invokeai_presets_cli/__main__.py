@@ -3,6 +3,14 @@ from . import cli
 
 
 def main():
+    from rich.traceback import install
+
+    install()
+
     if len(sys.argv) == 1:
         sys.argv.append("--help")
     cli.invoke_presets_cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import json
+import sqlite3
+
+from typing import List, Dict, Any, Optional
+
+__all__ = [
+    "init_catalog",
+    "add_snapshot",
+    "get_snapshots",
+    "get_snapshot",
+    "remove_snapshots",
+    "prune_snapshots",
+]
+
+SNAPSHOT_COLUMNS = (
+    "name",
+    "timestamp",
+    "path",
+    "scope",
+    "compression",
+    "size",
+    "raw_size",
+    "row_count",
+    "content_hash",
+)
+
+# Grandfather-father-son retention: the newest `keep_last` snapshots are
+# always kept, plus the newest snapshot of each of the last `hourly` hours,
+# `daily` days and `weekly` weeks that have one. Everything else is pruned.
+PRUNE_QUERY = """
+    WITH ranked AS (
+        SELECT
+            name,
+            path,
+            ROW_NUMBER() OVER (ORDER BY timestamp DESC) AS recent,
+            ROW_NUMBER() OVER (
+                PARTITION BY strftime('%Y-%m-%d %H', timestamp) ORDER BY timestamp DESC
+            ) AS hour_rank,
+            DENSE_RANK() OVER (
+                ORDER BY strftime('%Y-%m-%d %H', timestamp) DESC
+            ) AS hour_bucket,
+            ROW_NUMBER() OVER (
+                PARTITION BY date(timestamp) ORDER BY timestamp DESC
+            ) AS day_rank,
+            DENSE_RANK() OVER (ORDER BY date(timestamp) DESC) AS day_bucket,
+            ROW_NUMBER() OVER (
+                PARTITION BY strftime('%Y-%W', timestamp) ORDER BY timestamp DESC
+            ) AS week_rank,
+            DENSE_RANK() OVER (
+                ORDER BY strftime('%Y-%W', timestamp) DESC
+            ) AS week_bucket
+        FROM snapshots
+    )
+    SELECT name, path FROM ranked
+    WHERE NOT (
+        recent <= :keep_last
+        OR (hour_rank = 1 AND hour_bucket <= :hourly)
+        OR (day_rank = 1 AND day_bucket <= :daily)
+        OR (week_rank = 1 AND week_bucket <= :weekly)
+    )
+"""
+
+
+def init_catalog(
+    catalog: sqlite3.Connection, legacy_json: Optional[str] = None
+) -> None:
+    with catalog:
+        catalog.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                path TEXT NOT NULL,
+                scope TEXT NOT NULL DEFAULT 'full',
+                compression TEXT NOT NULL DEFAULT 'none',
+                size INTEGER,
+                raw_size INTEGER,
+                row_count INTEGER,
+                content_hash TEXT
+            )
+            """
+        )
+        catalog.execute(
+            "CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots(timestamp)"
+        )
+    if legacy_json and os.path.exists(legacy_json):
+        import_legacy_snapshots(catalog, legacy_json)
+
+
+def import_legacy_snapshots(catalog: sqlite3.Connection, legacy_json: str) -> int:
+    # One-off move of the entries kept in snapshots.json by earlier versions
+    try:
+        with open(legacy_json, "r") as f:
+            snapshots = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        snapshots = []
+    with catalog:
+        for snapshot in snapshots:
+            add_snapshot(catalog, snapshot, replace=False)
+    os.replace(legacy_json, legacy_json + ".migrated")
+    return len(snapshots)
+
+
+def add_snapshot(
+    catalog: sqlite3.Connection, snapshot: Dict[str, Any], replace: bool = True
+) -> None:
+    values = {column: snapshot.get(column) for column in SNAPSHOT_COLUMNS}
+    values["scope"] = values["scope"] or "full"
+    values["compression"] = values["compression"] or "none"
+    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+    with catalog:
+        catalog.execute(
+            f"{verb} INTO snapshots ({', '.join(SNAPSHOT_COLUMNS)}) "
+            f"VALUES ({', '.join(':' + column for column in SNAPSHOT_COLUMNS)})",
+            values,
+        )
+
+
+def get_snapshots(catalog: sqlite3.Connection) -> List[Dict[str, Any]]:
+    cursor = catalog.execute(
+        f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM snapshots ORDER BY timestamp"
+    )
+    return [dict(zip(SNAPSHOT_COLUMNS, row)) for row in cursor]
+
+
+def get_snapshot(catalog: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    row = catalog.execute(
+        f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM snapshots WHERE name = ?",
+        (name,),
+    ).fetchone()
+    return dict(zip(SNAPSHOT_COLUMNS, row)) if row else None
+
+
+def remove_snapshots(catalog: sqlite3.Connection, names: List[str]) -> int:
+    with catalog:
+        return catalog.execute(
+            "DELETE FROM snapshots WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(names)),),
+        ).rowcount
+
+
+def prune_snapshots(
+    catalog: sqlite3.Connection,
+    keep_last: int,
+    hourly: int = 0,
+    daily: int = 0,
+    weekly: int = 0,
+) -> List[Dict[str, str]]:
+    policy = {
+        "keep_last": keep_last,
+        "hourly": hourly,
+        "daily": daily,
+        "weekly": weekly,
+    }
+    expired = [
+        {"name": name, "path": path}
+        for name, path in catalog.execute(PRUNE_QUERY, policy)
+    ]
+    remove_snapshots(catalog, [snapshot["name"] for snapshot in expired])
+    return expired
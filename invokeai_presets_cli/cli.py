@@ -1,25 +1,8 @@
 from .__version__ import __version__
 import typer
+from typing import List, Optional
 from typing_extensions import Annotated
 
-
-from .functions import (
-    display_presets,
-    list_snapshots,
-    delete_snapshot,
-    restore_snapshot,
-    create_snapshot,
-    export_presets,
-    import_presets,
-    delete_presets,
-    about_cli,
-)
-
-from rich.traceback import install
-
-install()
-
-
 """
 =========================================================================
 Invoke Preset CLI - Simplified Tool for installing Invoke AI styling presets
@@ -39,15 +22,20 @@ $ invoke-presets [OPTIONS] [COMMAND] [ARGS]
 Commands:
 
 invoke-presets about --readme --changelog --version [-c, -r, -v]
-invoke-presets list [--all, --only-defaults]
-invoke-presets database create-snapshot
+invoke-presets list [--all, --only-defaults, --after <name>, --before <name>]
+invoke-presets search <words...> [--type <type>, --limit <n>]
+invoke-presets dedupe [--threshold <0-1>, --type <type>, --remove]
+invoke-presets database create-snapshot [--full]
 invoke-presets database list-snapshots
 invoke-presets database delete-snapshot
-invoke-presets database restore-snapshot
+invoke-presets database restore-snapshot [--presets-only]
+invoke-presets database restore-presets <snapshot> [--names <name>, --type <type>, --match <pattern>, --on-conflict skip|replace]
+invoke-presets database diff <snapshot> [<snapshot>] [--json]
 invoke-presets tools
-invoke-presets export 
-invoke-presets import 
-invoke-presets delete
+invoke-presets export [--output <file>, --type <type>, --match <pattern>, --since <date>]
+invoke-presets import [URLS...] [--manifest <file>, --file <file>, --plan <file>, --apply-plan <file>]
+invoke-presets delete [--dry-run]
+invoke-presets sync <directory> [--type <type>, --dry-run, --watch, --poll]
 """
 
 __all__ = ["invoke_presets_cli"]
@@ -64,15 +52,29 @@ invoke_presets_cli.add_typer(
     no_args_is_help=True,
 )
 
+
 @database_cli.command(
     "create-snapshot", help="Create a snapshot of the Invoke AI database."
 )
-def datebase_create_command():
-    create_snapshot()
+def datebase_create_command(
+    full: Annotated[
+        bool,
+        typer.Option(
+            "--full",
+            help="Back up the whole Invoke AI database instead of only the style presets.",
+            show_default="False",
+        ),
+    ] = False,
+):
+    from .functions import create_snapshot
+
+    create_snapshot("full" if full else "presets")
 
 
 @database_cli.command("list-snapshots", help="List all available snapshots.")
 def database_list_command():
+    from .functions import list_snapshots
+
     list_snapshots()
 
 
@@ -80,18 +82,113 @@ def database_list_command():
     "delete-snapshot", help="Delete a snapshot of the Invoke AI database."
 )
 def database_delete_command():
+    from .functions import delete_snapshot
+
     delete_snapshot()
 
 
 @database_cli.command(
     "restore-snapshot", help="Restore a snapshot of the Invoke AI database."
 )
-def database_restore_command():
-    restore_snapshot()
+def database_restore_command(
+    presets_only: Annotated[
+        bool,
+        typer.Option(
+            "--presets-only",
+            help="Only restore the style presets table, even from a full snapshot.",
+            show_default="False",
+        ),
+    ] = False,
+):
+    from .functions import restore_snapshot
+
+    restore_snapshot(presets_only)
+
+
+@database_cli.command(
+    "restore-presets", help="Restore selected style presets from a snapshot."
+)
+def database_restore_presets_command(
+    snapshot: Annotated[str, typer.Argument(help="Name of the snapshot.")],
+    names: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--names",
+            "-n",
+            help="Preset name to restore, can be given several times.",
+            show_default=False,
+        ),
+    ] = None,
+    preset_type: Annotated[
+        Optional[str],
+        typer.Option(
+            "--type",
+            "-t",
+            help="Only restore presets of this type (user, default, project).",
+            show_default=False,
+        ),
+    ] = None,
+    match: Annotated[
+        Optional[str],
+        typer.Option(
+            "--match",
+            "-m",
+            help="Only restore presets whose name matches, * works as a wildcard.",
+            show_default=False,
+        ),
+    ] = None,
+    on_conflict: Annotated[
+        str,
+        typer.Option(
+            "--on-conflict",
+            help="What to do with presets that already exist: skip or replace.",
+        ),
+    ] = "skip",
+):
+    from .functions import restore_presets_from_snapshot
+
+    restore_presets_from_snapshot(snapshot, names, preset_type, match, on_conflict)
+
+
+@database_cli.command(
+    "diff", help="Show the style preset changes between two snapshots."
+)
+def database_diff_command(
+    old: Annotated[str, typer.Argument(help="Name of the older snapshot.")],
+    new: Annotated[
+        Optional[str],
+        typer.Argument(
+            help="Name of the newer snapshot, defaults to the live database.",
+            show_default=False,
+        ),
+    ] = None,
+    as_json: Annotated[
+        bool,
+        typer.Option("--json", help="Print the changes as JSON.", show_default="False"),
+    ] = False,
+):
+    from .functions import diff_snapshots
+
+    diff_snapshots(old, new, as_json)
 
 
 @invoke_presets_cli.command("import", help="Import a style preset")
 def styles_import_command(
+    urls: Annotated[
+        Optional[List[str]],
+        typer.Argument(
+            help="One or more URLs of JSON preset files to fetch concurrently.",
+            show_default=False,
+        ),
+    ] = None,
+    manifest: Annotated[
+        Optional[str],
+        typer.Option(
+            "--manifest",
+            "-m",
+            help="A file listing preset URLs, one per line or as a JSON list.",
+        ),
+    ] = None,
     project_type: Annotated[
         bool,
         typer.Option(
@@ -100,19 +197,107 @@ def styles_import_command(
             help="The type of preset to import, either 'user' or 'project'. Default is 'user'",
             show_default="False",
         ),
-    ] = False
+    ] = False,
+    files: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--file",
+            "-f",
+            help="A local JSON preset file, can be given several times.",
+            show_default=False,
+        ),
+    ] = None,
+    plan: Annotated[
+        Optional[str],
+        typer.Option(
+            "--plan",
+            help="Write what the import would change to this JSON file, without importing.",
+            show_default=False,
+        ),
+    ] = None,
+    apply_plan: Annotated[
+        Optional[str],
+        typer.Option(
+            "--apply-plan",
+            help="Apply a plan written by --plan in a single transaction.",
+            show_default=False,
+        ),
+    ] = None,
 ):
-    import_presets(project_type)
+    from .functions import import_presets, plan_presets_import, apply_import_plan
+
+    if apply_plan:
+        apply_import_plan(apply_plan)
+    elif plan:
+        plan_presets_import(plan, project_type, urls, manifest, files)
+    else:
+        import_presets(project_type, urls, manifest, files)
 
 
 @invoke_presets_cli.command("export", help="Export a style preset")
-def styles_export_command():
-    export_presets()
+def styles_export_command(
+    output: Annotated[
+        Optional[str],
+        typer.Option(
+            "--output",
+            "-o",
+            help="Export straight to this file (.json or .jsonl, optionally .gz or .zst) without prompting.",
+            show_default=False,
+        ),
+    ] = None,
+    preset_type: Annotated[
+        Optional[str],
+        typer.Option(
+            "--type",
+            "-t",
+            help="Only export presets of this type (user, default, project).",
+            show_default=False,
+        ),
+    ] = None,
+    match: Annotated[
+        Optional[str],
+        typer.Option(
+            "--match",
+            "-m",
+            help="Only export presets whose name matches, * works as a wildcard.",
+            show_default=False,
+        ),
+    ] = None,
+    since: Annotated[
+        Optional[str],
+        typer.Option(
+            "--since",
+            help="Only export presets updated on or after this date (YYYY-MM-DD[ HH:MM:SS]).",
+            show_default=False,
+        ),
+    ] = None,
+):
+    from .functions import export_presets, export_presets_to_file
+
+    if output:
+        export_presets_to_file(output, preset_type, match, since)
+    elif preset_type or match or since:
+        raise typer.BadParameter(
+            "--type, --match and --since need --output.", param_hint="--output"
+        )
+    else:
+        export_presets()
 
 
 @invoke_presets_cli.command("delete", help="Delete a style preset")
-def styles_delete_command():
-    delete_presets()
+def styles_delete_command(
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Only show how many presets would be deleted.",
+            show_default="False",
+        ),
+    ] = False,
+):
+    from .functions import delete_presets
+
+    delete_presets(dry_run)
 
 
 @invoke_presets_cli.command("list", help="List all available style presets.")
@@ -157,8 +342,147 @@ def styles_list_command(
             show_default="10",
         ),
     ] = 10,
+    after: Annotated[
+        Optional[str],
+        typer.Option(
+            "--after",
+            help="Start listing after the preset with this name.",
+        ),
+    ] = None,
+    before: Annotated[
+        Optional[str],
+        typer.Option(
+            "--before",
+            help="Start listing before the preset with this name.",
+        ),
+    ] = None,
+):
+    from .functions import display_presets
+
+    display_presets(
+        show_defaults, show_all, show_project, page, items_per_page, after, before
+    )
+
+
+@invoke_presets_cli.command(
+    "search", help="Search style presets by name and prompt text."
+)
+def styles_search_command(
+    query: Annotated[
+        List[str], typer.Argument(help="Words to look for, prefixes match too.")
+    ],
+    preset_type: Annotated[
+        Optional[str],
+        typer.Option(
+            "--type",
+            "-t",
+            help="Only search presets of this type (user, default, project).",
+            show_default=False,
+        ),
+    ] = None,
+    limit: Annotated[
+        int,
+        typer.Option(
+            "--limit",
+            "-l",
+            help="Maximum number of results.",
+            show_default="20",
+        ),
+    ] = 20,
 ):
-    display_presets(show_defaults, show_all, show_project, page, items_per_page)
+    from .functions import search_presets
+
+    search_presets(" ".join(query), preset_type, limit)
+
+
+@invoke_presets_cli.command(
+    "dedupe", help="Find style presets with near-identical prompts."
+)
+def styles_dedupe_command(
+    threshold: Annotated[
+        float,
+        typer.Option(
+            "--threshold",
+            help="Minimum prompt similarity (0-1) for two presets to be duplicates.",
+            show_default="0.8",
+        ),
+    ] = 0.8,
+    preset_type: Annotated[
+        Optional[str],
+        typer.Option(
+            "--type",
+            "-t",
+            help="Only compare presets of this type (user, default, project).",
+            show_default=False,
+        ),
+    ] = None,
+    remove: Annotated[
+        bool,
+        typer.Option(
+            "--remove",
+            help="Delete all but one preset per cluster, after a snapshot.",
+            show_default="False",
+        ),
+    ] = False,
+):
+    from .functions import dedupe_presets
+
+    dedupe_presets(threshold, preset_type, remove)
+
+
+@invoke_presets_cli.command(
+    "sync", help="Make the presets of one type match a directory of JSON files."
+)
+def styles_sync_command(
+    directory: Annotated[
+        str,
+        typer.Argument(help="Directory of preset JSON files, searched recursively."),
+    ],
+    preset_type: Annotated[
+        str,
+        typer.Option(
+            "--type",
+            "-t",
+            help="The preset type the directory holds (user or project).",
+        ),
+    ] = "user",
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Only show what would be created, updated and deleted.",
+            show_default="False",
+        ),
+    ] = False,
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "--watch",
+            "-w",
+            help="Keep running and apply file changes to the database as they happen.",
+            show_default="False",
+        ),
+    ] = False,
+    poll: Annotated[
+        bool,
+        typer.Option(
+            "--poll",
+            help="Watch by polling instead of inotify.",
+            show_default="False",
+        ),
+    ] = False,
+):
+    from .functions import sync_presets, watch_presets
+
+    if watch and dry_run:
+        # A watch applies every change as it happens, there is nothing to preview
+        raise typer.BadParameter(
+            "--dry-run cannot be combined with --watch.", param_hint="--dry-run"
+        )
+    if watch:
+        watch_presets(directory, preset_type, poll)
+    else:
+        sync_presets(directory, preset_type, dry_run)
 
 
 @invoke_presets_cli.command("about", help="Functions for information on this tool.")
@@ -184,4 +508,6 @@ def about_command(
         typer.echo(f"InvokeAI Preset CLI version: {__version__}", color=True)
         return
 
+    from .about import about_cli
+
     about_cli(readme, changelog)
@@ -0,0 +1,211 @@
+import operator
+import random
+import re
+import sqlite3
+import zlib
+
+from array import array
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Set
+
+__all__ = [
+    "init_signature_cache",
+    "sync_signatures",
+    "find_duplicate_clusters",
+    "minhash_signature",
+    "prompt_shingles",
+]
+
+# 16 bands of 4 rows put the LSH candidate threshold near 0.5, so clusters
+# above the default 0.8 similarity are found with very few misses
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SIGNATURE_SEED = 20241016
+# Bumped whenever normalisation or hashing changes, old signatures are dropped
+SIGNATURE_VERSION = "1"
+# Members of one LSH bucket are compared against at most this many cluster
+# representatives, so a crowded bucket never turns into an all-pairs scan
+BUCKET_PROBES = 8
+PERMUTATION_MASKS = [
+    random.Random(SIGNATURE_SEED + i).getrandbits(32) for i in range(NUM_PERM)
+]
+
+
+def init_signature_cache(cache: sqlite3.Connection) -> None:
+    # One MinHash signature per preset id, valid while updated_at is unchanged
+    with cache:
+        cache.execute(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                id TEXT PRIMARY KEY,
+                updated_at TEXT,
+                signature BLOB
+            ) WITHOUT ROWID
+            """
+        )
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS signature_meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        row = cache.execute(
+            "SELECT value FROM signature_meta WHERE key = 'version'"
+        ).fetchone()
+        if not row or row[0] != SIGNATURE_VERSION:
+            cache.execute("DELETE FROM signatures")
+            cache.execute(
+                "INSERT OR REPLACE INTO signature_meta VALUES ('version', ?)",
+                (SIGNATURE_VERSION,),
+            )
+
+
+def normalize_prompt(text: Optional[str]) -> List[str]:
+    # Case, punctuation, spacing and the {prompt} placeholder never count
+    if not text:
+        return []
+    return re.findall(r"\w+", text.casefold().replace("{prompt}", " "))
+
+
+def prompt_shingles(positive: Optional[str], negative: Optional[str]) -> Set[str]:
+    # Word pairs, tagged by prompt so a word moving from the positive to the
+    # negative prompt is a real difference
+    shingles = set()
+    for tag, text in (("+", positive), ("-", negative)):
+        words = normalize_prompt(text)
+        if len(words) == 1:
+            shingles.add(f"{tag}{words[0]}")
+        shingles.update(
+            f"{tag}{first} {second}" for first, second in zip(words, words[1:])
+        )
+    return shingles
+
+
+def minhash_signature(shingles: Set[str]) -> Optional[bytes]:
+    # XOR with a fixed mask stands in for each permutation, which keeps the
+    # inner loop in C through map and min
+    if not shingles:
+        return None
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return array(
+        "I", [min(map(mask.__xor__, hashes)) for mask in PERMUTATION_MASKS]
+    ).tobytes()
+
+
+def sync_signatures(cache: sqlite3.Connection, database_path: str) -> Tuple[int, int]:
+    # Only presets whose updated_at differs from the cached one are hashed
+    cache.execute("ATTACH DATABASE ? AS live", (database_path,))
+    try:
+        with cache:
+            removed = cache.execute(
+                """
+                DELETE FROM signatures WHERE NOT EXISTS (
+                    SELECT 1 FROM live.style_presets AS s WHERE s.id = signatures.id
+                )
+                """
+            ).rowcount
+            changed = cache.execute(
+                """
+                SELECT
+                    s.id,
+                    s.updated_at,
+                    json_extract(s.preset_data, '$.positive_prompt'),
+                    json_extract(s.preset_data, '$.negative_prompt')
+                FROM live.style_presets AS s
+                LEFT JOIN signatures AS c ON c.id = s.id
+                WHERE c.updated_at IS NOT s.updated_at AND json_valid(s.preset_data)
+                """
+            ).fetchall()
+            cache.executemany(
+                "INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)",
+                (
+                    (
+                        preset_id,
+                        updated_at,
+                        minhash_signature(prompt_shingles(positive, negative)),
+                    )
+                    for preset_id, updated_at, positive, negative in changed
+                ),
+            )
+    finally:
+        cache.execute("DETACH DATABASE live")
+    return len(changed), removed
+
+
+def signature_similarity(first: array, second: array) -> float:
+    return sum(map(operator.eq, first, second)) / NUM_PERM
+
+
+def find_duplicate_clusters(
+    cache: sqlite3.Connection,
+    database_path: str,
+    threshold: float = 0.8,
+    preset_type: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    type_clause = "AND s.type = :type" if preset_type else ""
+    cache.execute("ATTACH DATABASE ? AS live", (database_path,))
+    try:
+        rows = cache.execute(
+            f"""
+            SELECT s.id, s.name, s.type, c.signature
+            FROM signatures AS c
+            JOIN live.style_presets AS s ON s.id = c.id
+            WHERE c.signature IS NOT NULL {type_clause}
+            """,
+            {"type": preset_type},
+        ).fetchall()
+    finally:
+        cache.execute("DETACH DATABASE live")
+
+    # Presets with identical signatures are settled without any comparison,
+    # LSH only has to pair up the distinct signatures
+    groups: Dict[bytes, List[int]] = defaultdict(list)
+    for position, row in enumerate(rows):
+        groups[row[3]].append(position)
+    signatures = list(groups)
+
+    parent = list(range(len(signatures)))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    vectors = [array("I", signature) for signature in signatures]
+    width = ROWS * vectors[0].itemsize if vectors else 0
+    for band in range(BANDS):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        for node, signature in enumerate(signatures):
+            buckets[signature[band * width : (band + 1) * width]].append(node)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            representatives: List[int] = []
+            for node in members:
+                root = find(node)
+                for other in representatives[:BUCKET_PROBES]:
+                    other_root = find(other)
+                    if other_root == root:
+                        break
+                    if signature_similarity(vectors[node], vectors[other]) >= threshold:
+                        parent[root] = other_root
+                        break
+                else:
+                    representatives.append(node)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for node, signature in enumerate(signatures):
+        clusters[find(node)].extend(groups[signature])
+
+    result = []
+    for positions in clusters.values():
+        if len(positions) < 2:
+            continue
+        members = [
+            {"id": rows[p][0], "name": rows[p][1], "type": rows[p][2]}
+            for p in positions
+        ]
+        # Non-user presets first, they are the ones kept when removing
+        members.sort(key=lambda m: (m["type"] == "user", m["name"], m["id"]))
+        result.append(members)
+    result.sort(key=lambda members: (-len(members), members[0]["name"]))
+    return result
@@ -1,35 +1,70 @@
 import uuid
+import time
+import hashlib
 import typer
-import shutil
 import os
 import math
 import json
-import inquirer
-import httpx
-import importlib.resources
-
 import tempfile
+import textwrap
 
-from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Set, Optional, Iterator, Iterable, Callable
 
 import sqlite3
-from .helpers import get_db, feedback_message, create_table, random_name
+from .picker import ListChoices, pick
+from .validation import PresetRecord, PresetError, validate_positions, merge_sources
+from .hashes import PresetIndex, record_hash, stored_preset_hashes
+from .catalog import (
+    init_catalog,
+    add_snapshot,
+    get_snapshots,
+    get_snapshot,
+    remove_snapshots,
+    prune_snapshots,
+)
+from .helpers import (
+    db_connection,
+    close_connections,
+    compress_file,
+    decompress_file,
+    open_text_output,
+    compression_for,
+    default_compression,
+    format_size,
+    COMPRESSION_SUFFIXES,
+    feedback_message,
+    create_table,
+    random_name,
+)
 
-from rich.markdown import Markdown
 from rich.console import Console
-
-from rich.traceback import install
-
-install()
-
-from . import SNAPSHOTS, DATABASE_PATH, SNAPSHOTS_DIR, SNAPSHOTS_JSON
+from rich.table import Table
+
+from . import (
+    SNAPSHOTS,
+    SNAPSHOTS_HOURLY,
+    SNAPSHOTS_DAILY,
+    SNAPSHOTS_WEEKLY,
+    DATABASE_PATH,
+    SNAPSHOTS_DIR,
+    SNAPSHOTS_JSON,
+    SNAPSHOTS_CATALOG,
+    HTTP_CACHE_PATH,
+    SEARCH_INDEX_PATH,
+    SIGNATURES_PATH,
+    PRESET_HASHES_PATH,
+    SYNC_SCAN_PATH,
+    create_snapshot_directory,
+)
 
 console = Console()
 
 __all__ = [
-    "get_presets_list",
     "create_snapshot",
     "list_snapshots",
     "delete_snapshot",
@@ -41,11 +76,10 @@ __all__ = [
 
 
 def map_presets() -> Dict[str, List[Tuple[str, str]]]:
-    db = get_db(DATABASE_PATH, connection=True)
     preset_types = ["user", "project", "default"]
     preset_map = {preset_type: [] for preset_type in preset_types}
     try:
-        with db:
+        with db_connection(DATABASE_PATH) as db:
             cursor = db.cursor()
             for preset_type in preset_types:
                 cursor.execute(
@@ -64,88 +98,331 @@ def map_presets() -> Dict[str, List[Tuple[str, str]]]:
 # ANCHOR: PRESET FUNCTIONS START
 
 
-def get_presets_list(
-    show_defaults: bool,
-    show_all: bool,
-    show_project: bool,
-    page: int = 1,
-    items_per_page: int = 10,
-) -> Tuple[int, List[Dict[str, Any]]]:
-    db = get_db(DATABASE_PATH, connection=True)
-    base_query = "SELECT * FROM style_presets"
+def get_presets_condition(
+    show_defaults: bool, show_all: bool, show_project: bool
+) -> str:
     conditions = {
         (False, True, False): "",
         (False, False, False): "WHERE type = 'user'",
         (True, False, False): "WHERE type = 'default'",
         (False, False, True): "WHERE type = 'project'",
     }
-    condition = conditions.get(
+    return conditions.get(
         (show_defaults, show_all, show_project), "WHERE type = 'default'"
     )
 
-    # Count total presets
-    count_query = f"SELECT COUNT(*) FROM style_presets {condition}".strip()
-    total_presets = db.execute(count_query).fetchone()[0]
 
-    # Fetch paginated presets
-    offset = (page - 1) * items_per_page
-    query = f"{base_query} {condition} LIMIT ? OFFSET ?".strip()
-    presets = list(db.execute(query, (items_per_page, offset)))
+# Keyset pagination walks style_presets in (type, name, id) order, so a page is
+# located from the last row seen rather than by skipping rows. The database
+# belongs to InvokeAI, so no index is created for it
+PRESET_SORT_KEY = "type, name, id"
+PRESET_PAGE_COLUMNS = "id, name, preset_data, type"
+
+PresetKey = Tuple[str, str, str]
+
 
-    return total_presets, presets
+def extend_condition(condition: str, clause: str) -> str:
+    if condition:
+        return f"{condition} AND {clause}"
+    return f"WHERE {clause}"
 
 
-def get_preset_page_count(
-    show_defaults: bool, show_all: bool, show_project: bool, items_per_page: int = 10
+def preset_filter(
+    names: Optional[List[str]] = None,
+    preset_type: Optional[str] = None,
+    match: Optional[str] = None,
+    alias: str = "",
+    ids: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    # Named parameters so the condition can be combined with other clauses
+    prefix = f"{alias}." if alias else ""
+    condition, params = "", {}
+    if ids is not None:
+        condition = extend_condition(
+            condition, f"{prefix}id IN (SELECT value FROM json_each(:ids))"
+        )
+        params["ids"] = json.dumps(list(ids))
+    if names:
+        condition = extend_condition(
+            condition, f"{prefix}name IN (SELECT value FROM json_each(:names))"
+        )
+        params["names"] = json.dumps(list(names))
+    if preset_type:
+        condition = extend_condition(condition, f"{prefix}type = :type")
+        params["type"] = preset_type
+    if match:
+        # "*" works as a wildcard, a plain word matches anywhere in the name
+        pattern = match.replace("*", "%")
+        condition = extend_condition(condition, f"{prefix}name LIKE :match")
+        params["match"] = pattern if "%" in pattern else f"%{pattern}%"
+    if since:
+        # julianday reads both the trigger's "YYYY-MM-DD HH:MM:SS" and isoformat
+        condition = extend_condition(
+            condition, f"julianday({prefix}updated_at) >= julianday(:since)"
+        )
+        params["since"] = since
+    return condition, params
+
+
+def count_presets(
+    db: sqlite3.Connection, condition: str, params: Optional[Dict[str, Any]] = None
 ) -> int:
-    total_presets, _ = get_presets_list(
-        show_defaults, show_all, show_project, 1, items_per_page
+    count_query = f"SELECT COUNT(*) FROM style_presets {condition}".strip()
+    return db.execute(count_query, params or {}).fetchone()[0]
+
+
+def count_presets_before(db: sqlite3.Connection, condition: str, key: PresetKey) -> int:
+    where = extend_condition(condition, f"({PRESET_SORT_KEY}) < (?, ?, ?)")
+    query = f"SELECT COUNT(*) FROM style_presets {where}"
+    return db.execute(query, key).fetchone()[0]
+
+
+def resolve_preset_cursor(
+    db: sqlite3.Connection, condition: str, name: str
+) -> Optional[PresetKey]:
+    query = (
+        f"SELECT {PRESET_SORT_KEY} FROM style_presets "
+        f"{extend_condition(condition, 'name = ?')} "
+        f"ORDER BY {PRESET_SORT_KEY} LIMIT 1"
     )
-    return math.ceil(total_presets / items_per_page)
+    return db.execute(query, (name,)).fetchone()
+
+
+def preset_key(preset: Tuple[str, str, str, str]) -> PresetKey:
+    return (preset[3], preset[1], preset[0])
 
 
-def import_presets(project_type: bool) -> None:
-    source = inquirer.list_input(
-        "Select import source", choices=["Local File", "URL", "Cancel"]
+def get_presets_page(
+    db: sqlite3.Connection,
+    condition: str,
+    items_per_page: int = 10,
+    after: Optional[PresetKey] = None,
+    before: Optional[PresetKey] = None,
+    offset: int = 0,
+    params: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[str, str, str, str]]:
+    # Named parameters throughout, so `condition` can come from preset_filter
+    values = {**(params or {}), "limit": items_per_page, "offset": offset}
+    cursor_key = "(:key_type, :key_name, :key_id)"
+    if after is not None:
+        values.update(zip(("key_type", "key_name", "key_id"), after))
+        where = extend_condition(condition, f"({PRESET_SORT_KEY}) > {cursor_key}")
+        query = f"SELECT {PRESET_PAGE_COLUMNS} FROM style_presets {where} ORDER BY {PRESET_SORT_KEY} LIMIT :limit"
+        return list(db.execute(query, values))
+
+    if before is not None:
+        # Walk backwards from the cursor, then restore ascending order
+        values.update(zip(("key_type", "key_name", "key_id"), before))
+        where = extend_condition(condition, f"({PRESET_SORT_KEY}) < {cursor_key}")
+        query = f"SELECT {PRESET_PAGE_COLUMNS} FROM style_presets {where} ORDER BY type DESC, name DESC, id DESC LIMIT :limit"
+        return list(reversed(list(db.execute(query, values))))
+
+    # Only used to land on an explicit --page, navigation continues by keyset
+    query = f"SELECT {PRESET_PAGE_COLUMNS} FROM style_presets {condition} ORDER BY {PRESET_SORT_KEY} LIMIT :limit OFFSET :offset"
+    return list(db.execute(query, values))
+
+
+def build_preset_index(
+    preset_type: Optional[str] = None,
+) -> PresetIndex:
+    # (name, type) -> (id, type, content hash) over every row. The hashes live in a
+    # sidecar cache keyed by updated_at, so only rows written since the last
+    # import are hashed again
+    from .hashes import init_hash_cache, sync_preset_hashes, load_preset_index
+
+    os.makedirs(os.path.dirname(PRESET_HASHES_PATH), exist_ok=True)
+    with db_connection(PRESET_HASHES_PATH) as cache:
+        init_hash_cache(cache)
+        sync_preset_hashes(cache, DATABASE_PATH)
+        return load_preset_index(cache, DATABASE_PATH, preset_type)
+
+
+def parse_presets_source(content: str) -> List[Dict[str, Any]]:
+    try:
+        presets = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Error parsing JSON: {str(e)} near: {content[max(0, e.pos-20):e.pos+20]}"
+        )
+    if not isinstance(presets, list):
+        raise ValueError("Invalid JSON format. Expected a list of presets.")
+    return presets
+
+
+# Bump when parse_presets_source or the validation changes so cached results
+# from older versions are not reused
+PRESETS_PARSE_KEY = "presets:3"
+VALIDATION_ERRORS_SHOWN = 20
+
+# (source, positioned records, problems) of one validated source
+ValidatedSource = Tuple[str, List[Tuple[int, PresetRecord]], List[PresetError]]
+
+
+def validate_presets_source(content: str, project_type: bool = False) -> Dict[str, Any]:
+    # Parsed and validated in one step, which fetch_sources runs off the event
+    # loop and caches with the body, so a 304 skips both
+    records, errors = validate_positions(parse_presets_source(content), project_type)
+    return {
+        "records": [[position, *record] for position, record in records],
+        "errors": [list(error) for error in errors],
+    }
+
+
+def fetch_validated_sources(
+    urls: List[str], project_type: bool = False
+) -> List[Dict[str, Any]]:
+    parse_key = f"{PRESETS_PARSE_KEY}:{'project' if project_type else 'as-is'}"
+    results = fetch_json_sources(
+        urls, partial(validate_presets_source, project_type=project_type), parse_key
     )
+    for result in results:
+        if not result["error"]:
+            url, data = result["url"], result["data"]
+            result["data"] = (
+                url,
+                [
+                    (position, PresetRecord(*record))
+                    for position, *record in data["records"]
+                ],
+                [PresetError(*error)._replace(source=url) for error in data["errors"]],
+            )
+    return results
 
-    if source == "Cancel":
-        console.print("Import cancelled.")
+
+def read_presets_file(file_path: str, project_type: bool = False) -> ValidatedSource:
+    with open(file_path, "r", encoding="utf-8") as f:
+        presets = parse_presets_source(f.read())
+    return (file_path, *validate_positions(presets, project_type, file_path))
+
+
+def report_validation_errors(errors: List[PresetError]) -> None:
+    if not errors:
         return
+    errors_table = create_table(
+        f"{len(errors)} problem(s) found, those presets are skipped",
+        [("Path", "yellow"), ("Preset", "white"), ("Problem", "red")],
+    )
+    for error in errors[:VALIDATION_ERRORS_SHOWN]:
+        path = f"{error.source} {error.path}" if error.source else error.path
+        errors_table.add_row(path, error.name, error.message)
+    console.print(errors_table)
+    if len(errors) > VALIDATION_ERRORS_SHOWN:
+        console.print(
+            f"[dim]... and {len(errors) - VALIDATION_ERRORS_SHOWN} more problems[/dim]"
+        )
+
+
+def fetch_json_sources(
+    urls: List[str], parse: Any, parse_key: str
+) -> List[Dict[str, Any]]:
+    from .sources import fetch_sources, ResponseCache
+
+    try:
+        cache = ResponseCache(HTTP_CACHE_PATH)
+    except (OSError, sqlite3.Error):
+        cache = None
+    try:
+        return fetch_sources(urls, parse, cache, parse_key)
+    finally:
+        if cache:
+            cache.close()
+
+
+def load_presets_from_urls(
+    urls: List[str], project_type: bool = False
+) -> Optional[List[ValidatedSource]]:
+    start = time.perf_counter()
+    with console.status(f"Fetching {len(urls)} source(s)..."):
+        results = fetch_validated_sources(urls, project_type)
+    elapsed = time.perf_counter() - start
+
+    sources = []
+    for result in results:
+        if result["error"]:
+            console.print(f"[bold red]{result['url']}:[/bold red] {result['error']}")
+            continue
+        cached = " (not modified)" if result["cached"] else ""
+        console.print(
+            f"[green]Fetched {len(result['data'][1])} presets from {result['url']}{cached} in {result['elapsed']:.2f}s[/green]"
+        )
+        sources.append(result["data"])
+
+    if len(urls) > 1:
+        console.print(f"[dim]Fetched {len(urls)} sources in {elapsed:.2f}s[/dim]")
+    if not sources and all(result["error"] for result in results):
+        return None
+    return sources
 
-    presets_to_import = []
 
-    if source == "Local File":
-        file_path = inquirer.text(message="Enter the path to the JSON file")
+def load_presets_from_files(
+    files: List[str], project_type: bool = False
+) -> Optional[List[ValidatedSource]]:
+    sources = []
+    for file_path in files:
         try:
-            with open(file_path, "r") as f:
-                presets_to_import = json.load(f)
+            sources.append(read_presets_file(file_path, project_type))
         except Exception as e:
-            console.print(f"[bold red]Error reading file:[/bold red] {str(e)}")
-            return
-    else:
-        # URL
-        url = inquirer.text(message="Enter the URL of the JSON file")
+            console.print(f"[bold red]{file_path}:[/bold red] {str(e)}")
+            return None
+    return sources
+
+
+def import_presets(
+    project_type: bool,
+    urls: Optional[List[str]] = None,
+    manifest: Optional[str] = None,
+    files: Optional[List[str]] = None,
+) -> None:
+    import inquirer
+    from .sources import read_manifest
+
+    urls = list(urls or [])
+    if manifest:
         try:
-            response = httpx.get(url)
-            response.raise_for_status()
-            content = response.text
-            try:
-                presets_to_import = json.loads(content)
-            except json.JSONDecodeError as e:
-                console.print(f"[bold red]Error parsing JSON:[/bold red] {str(e)}")
-                console.print(
-                    f"Error occurred near: {content[max(0, e.pos-20):e.pos+20]}"
-                )
-                return
+            urls.extend(read_manifest(manifest))
         except Exception as e:
-            console.print(f"[bold red]Error fetching from URL:[/bold red] {str(e)}")
+            console.print(f"[bold red]Error reading manifest:[/bold red] {str(e)}")
             return
 
-    if not isinstance(presets_to_import, list):
-        console.print(
-            "[bold red]Error:[/bold red] Invalid JSON format. Expected a list of presets."
+    sources: List[ValidatedSource] = []
+
+    if urls or files:
+        sources = load_presets_from_files(files or [], project_type)
+        if sources is None:
+            return
+        if urls:
+            from_urls = load_presets_from_urls(urls, project_type)
+            if from_urls is None:
+                return
+            sources.extend(from_urls)
+    else:
+        source = inquirer.list_input(
+            "Select import source", choices=["Local File", "URL", "Cancel"]
         )
+
+        if source == "Cancel":
+            console.print("Import cancelled.")
+            return
+
+        if source == "Local File":
+            file_path = inquirer.text(message="Enter the path to the JSON file")
+            try:
+                sources = [read_presets_file(file_path, project_type)]
+            except Exception as e:
+                console.print(f"[bold red]Error reading file:[/bold red] {str(e)}")
+                return
+        else:
+            # URL
+            url = inquirer.text(message="Enter the URL of the JSON file")
+            sources = load_presets_from_urls([url], project_type)
+            if sources is None:
+                return
+
+    records, errors = merge_sources(sources)
+    report_validation_errors(errors)
+    if not records:
+        console.print("[yellow]No valid presets to import or update.[/yellow]")
         return
 
     # Ask user if they want to select presets or import all
@@ -159,49 +436,27 @@ def import_presets(project_type: bool) -> None:
         return
 
     if import_choice == "Select Presets":
-        choices = [
-            inquirer.Checkbox(
-                "selected_presets",
-                message="Select presets to import",
-                choices=[
-                    preset.get("name", f"Unnamed Preset {i}")
-                    for i, preset in enumerate(presets_to_import)
-                ],
-            )
-        ]
-        answers = inquirer.prompt(choices)
-        if not answers or not answers["selected_presets"]:
+        selected_positions = pick(
+            ListChoices([record.name for record in records]),
+            "Select presets to import",
+        )
+        if not selected_positions:
             console.print("No presets selected. Import cancelled.")
             return
-        selected_presets = [
-            preset
-            for preset in presets_to_import
-            if preset.get("name") in answers["selected_presets"]
+        selected_records = [
+            record for i, record in enumerate(records) if i in selected_positions
         ]
     else:  # Import All
-        selected_presets = presets_to_import
-
-    db = get_db(DATABASE_PATH, connection=True)
-    existing_presets = {
-        preset[1]: preset
-        for preset in get_presets_list(
-            show_defaults=False, show_all=True, show_project=False
-        )[1]
-    }
-    presets_to_update = []
-    presets_to_create = []
+        selected_records = records
 
-    for preset in selected_presets:
-        if not validate_preset(preset):
-            console.print(
-                f"[yellow]Skipping invalid preset: {preset.get('name', 'Unknown')}[/yellow]"
-            )
-            continue
-        converted_preset = convert_preset_format(preset, project_type)
-        if converted_preset["name"] in existing_presets:
-            presets_to_update.append(converted_preset)
-        else:
-            presets_to_create.append(converted_preset)
+    existing_presets = build_preset_index()
+    creates, updates, noops = classify_records(selected_records, existing_presets)
+    presets_to_create = [record.as_preset() for record in creates]
+    presets_to_update = [record.as_preset() for record in updates]
+    unchanged = len(noops)
+
+    if unchanged:
+        console.print(f"[dim]{unchanged} presets are unchanged and were skipped.[/dim]")
 
     presets_to_update_final = []
     if presets_to_update:
@@ -212,23 +467,22 @@ def import_presets(project_type: bool) -> None:
         if update_choice == "Update All":
             presets_to_update_final = presets_to_update
         elif update_choice == "Select Individually":
-            choices = [
-                inquirer.Checkbox(
-                    "selected_presets",
-                    message="Select presets to update",
-                    choices=[preset["name"] for preset in presets_to_update],
-                )
-            ]
-            answers = inquirer.prompt(choices)
-            if answers and answers["selected_presets"]:
+            selected_positions = pick(
+                ListChoices([preset["name"] for preset in presets_to_update]),
+                "Select presets to update",
+            )
+            if selected_positions:
                 presets_to_update_final = [
                     preset
-                    for preset in presets_to_update
-                    if preset["name"] in answers["selected_presets"]
+                    for i, preset in enumerate(presets_to_update)
+                    if i in selected_positions
                 ]
 
     if not presets_to_update_final and not presets_to_create:
-        console.print("[yellow]No valid presets to import or update.[/yellow]")
+        if unchanged and not presets_to_update:
+            console.print("[green]All selected presets are already up to date.[/green]")
+        else:
+            console.print("[yellow]No valid presets to import or update.[/yellow]")
         return
 
     # Create a snapshot before making changes
@@ -236,342 +490,1420 @@ def import_presets(project_type: bool) -> None:
 
     # Perform database operations
     try:
-        with db:
-            # This automatically manages transactions
-            cursor = db.cursor()
-            # Disable triggers temporarily
-            cursor.execute("PRAGMA recursive_triggers = OFF;")
-
-            for preset in presets_to_update_final:
-                update_preset_without_trigger(cursor, preset)
+        rows = stage_preset_rows(
+            presets_to_update_final, presets_to_create, existing_presets
+        )
+        with db_connection(DATABASE_PATH) as db:
+            with db:
+                # This automatically manages transactions
+                cursor = db.cursor()
+                # Disable triggers temporarily
+                cursor.execute("PRAGMA recursive_triggers = OFF;")
 
-            for preset in presets_to_create:
-                create_preset_without_trigger(cursor, preset)
+                start = time.perf_counter()
+                bulk_upsert_presets(cursor, rows)
+                elapsed = time.perf_counter() - start
 
-            # Re-enable triggers
-            cursor.execute("PRAGMA recursive_triggers = ON;")
+                # Re-enable triggers
+                cursor.execute("PRAGMA recursive_triggers = ON;")
 
         console.print(
             f"[green]Import complete. Created {len(presets_to_create)} new presets and updated {len(presets_to_update_final)} existing presets.[/green]"
         )
+        console.print(
+            f"[dim]Wrote {len(rows)} rows in {elapsed:.3f}s ({rows_per_second(len(rows), elapsed)} rows/s)[/dim]"
+        )
     except Exception as e:
         console.print(f"[bold red]Error during import:[/bold red] {str(e)}")
         console.print("[yellow]All changes have been rolled back.[/yellow]")
 
 
-def update_preset_without_trigger(
-    cursor: sqlite3.Cursor, preset: Dict[str, Any]
+def classify_records(
+    records: List[PresetRecord], existing_presets: PresetIndex
+) -> Tuple[List[PresetRecord], List[PresetRecord], List[PresetRecord]]:
+    # (creates, updates, no-ops); a record whose content hash matches the
+    # stored preset is a no-op, rewriting it would only bump updated_at
+    creates, updates, noops = [], [], []
+    for record in records:
+        existing = existing_presets.get((record.name, record.type))
+        if existing is None:
+            creates.append(record)
+        elif existing[2] == record_hash(record):
+            noops.append(record)
+        else:
+            updates.append(record)
+    return creates, updates, noops
+
+
+IMPORT_PLAN_VERSION = 1
+PLAN_FIELDS = ("type", "positive_prompt", "negative_prompt")
+
+
+def build_import_plan(sources: List[ValidatedSource]) -> Dict[str, Any]:
+    # Everything an import would do, computed without writing to the database
+    records, rejects = merge_sources(sources)
+
+    existing_presets = build_preset_index()
+    creates, updates, noops = classify_records(records, existing_presets)
+
+    # Field level diffs only need the stored rows of the updated presets
+    update_ids = [existing_presets[record.name, record.type][0] for record in updates]
+    with db_connection(DATABASE_PATH) as db:
+        stored = {
+            preset_id: (type, positive or "", negative or "")
+            for preset_id, type, positive, negative in db.execute(
+                """
+                SELECT
+                    id,
+                    type,
+                    json_extract(preset_data, '$.positive_prompt'),
+                    json_extract(preset_data, '$.negative_prompt')
+                FROM style_presets
+                WHERE id IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(update_ids),),
+            )
+        }
+
+    plan_updates = []
+    for record, preset_id in zip(updates, update_ids):
+        old = stored.get(preset_id, ("", "", ""))
+        new = (record.type, record.positive_prompt, record.negative_prompt)
+        plan_updates.append(
+            {
+                "id": preset_id,
+                "base_hash": existing_presets[record.name, record.type][2],
+                **record.as_preset(),
+                "changes": {
+                    field: {"old": old_value, "new": new_value}
+                    for field, old_value, new_value in zip(PLAN_FIELDS, old, new)
+                    if old_value != new_value
+                },
+            }
+        )
+
+    return {
+        "version": IMPORT_PLAN_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "database": DATABASE_PATH,
+        "sources": [source for source, _, _ in sources],
+        "summary": {
+            "create": len(creates),
+            "update": len(updates),
+            "noop": len(noops),
+            "reject": len(rejects),
+        },
+        "create": [record.as_preset() for record in creates],
+        "update": plan_updates,
+        "noop": [
+            {"id": existing_presets[record.name, record.type][0], "name": record.name}
+            for record in noops
+        ],
+        "reject": [error._asdict() for error in rejects],
+    }
+
+
+def print_import_plan_summary(plan: Dict[str, Any]) -> None:
+    summary_table = create_table(
+        "Import plan", [("Action", "white"), ("Presets", "yellow")]
+    )
+    for action, count in plan["summary"].items():
+        summary_table.add_row(action, str(count))
+    console.print(summary_table)
+
+
+def plan_presets_import(
+    plan_path: str,
+    project_type: bool = False,
+    urls: Optional[List[str]] = None,
+    manifest: Optional[str] = None,
+    files: Optional[List[str]] = None,
 ) -> None:
-    preset_data = preset["preset_data"]
-    # Fix: Avoid double JSON encoding - serialize only if it's a dictionary
+    from .sources import read_manifest
+
+    urls = list(urls or [])
+    if manifest:
+        try:
+            urls.extend(read_manifest(manifest))
+        except Exception as e:
+            console.print(f"[bold red]Error reading manifest:[/bold red] {str(e)}")
+            raise typer.Exit(1)
+    if not urls and not files:
+        feedback_message("--plan needs preset URLs, --manifest or --file.", "error")
+        raise typer.Exit(1)
+
+    # A plan is only useful when every source could be read
+    sources = load_presets_from_files(files or [], project_type)
+    if sources is None:
+        raise typer.Exit(1)
+    if urls:
+        with console.status(f"Fetching {len(urls)} source(s)..."):
+            results = fetch_validated_sources(urls, project_type)
+        for result in results:
+            if result["error"]:
+                console.print(
+                    f"[bold red]{result['url']}:[/bold red] {result['error']}"
+                )
+                raise typer.Exit(1)
+            sources.append(result["data"])
+
+    start = time.perf_counter()
+    plan = build_import_plan(sources)
+    elapsed = time.perf_counter() - start
+
+    with open(plan_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2, ensure_ascii=False)
+    print_import_plan_summary(plan)
+    report_validation_errors([PresetError(**reject) for reject in plan["reject"]])
+    console.print(f"[green]Plan written to {plan_path} in {elapsed:.2f}s[/green]")
+
+
+PLAN_PRESET_KEYS = {"name": str, "type": str, "preset_data": dict}
+PLAN_UPDATE_KEYS = {**PLAN_PRESET_KEYS, "id": str, "base_hash": str}
+
+
+def import_plan_problem(plan: Any) -> Optional[str]:
+    # A plan file can be edited or truncated by hand, so its shape is checked
+    # before anything in it is trusted
+    if not isinstance(plan, dict) or plan.get("version") != IMPORT_PLAN_VERSION:
+        return "not an import plan"
+    if not isinstance(plan.get("database"), str):
+        return "the plan does not name its database"
+    if not isinstance(plan.get("summary"), dict):
+        return "the plan has no summary"
+    for action, keys in (("create", PLAN_PRESET_KEYS), ("update", PLAN_UPDATE_KEYS)):
+        entries = plan.get(action)
+        if not isinstance(entries, list):
+            return f"'{action}' is not a list"
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not all(
+                isinstance(entry.get(key), kind) for key, kind in keys.items()
+            ):
+                return f"{action}[{position}] is missing {', '.join(keys)}"
+    if not isinstance(plan.get("reject", []), list):
+        return "'reject' is not a list"
+    if os.path.realpath(plan["database"]) != os.path.realpath(DATABASE_PATH):
+        return f"the plan was made for {plan['database']}, not {DATABASE_PATH}"
+    return None
+
+
+def check_import_plan(db: sqlite3.Connection, plan: Dict[str, Any]) -> List[str]:
+    # A plan is applied only against the database state it was computed from
+    problems = []
+    expected = {update["id"]: update["base_hash"] for update in plan["update"]}
+    current = stored_preset_hashes(db, list(expected))
+    for preset_id, base_hash in expected.items():
+        if current.get(preset_id) != base_hash:
+            problems.append(f"preset {preset_id} changed since the plan was made")
+    creates = {(preset["name"], preset["type"]) for preset in plan["create"]}
+    for name, type in db.execute(
+        "SELECT DISTINCT name, type FROM style_presets "
+        "WHERE name IN (SELECT value FROM json_each(?))",
+        (json.dumps([name for name, _ in creates]),),
+    ):
+        if (name, type) in creates:
+            problems.append(f"preset '{name}' was created since the plan was made")
+    return problems
+
+
+def apply_import_plan(plan_path: str) -> None:
+    try:
+        with open(plan_path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except Exception as e:
+        console.print(f"[bold red]Error reading plan:[/bold red] {str(e)}")
+        raise typer.Exit(1)
+    problem = import_plan_problem(plan)
+    if problem:
+        feedback_message(f"Cannot apply {plan_path}: {problem}.", "error")
+        raise typer.Exit(1)
+
+    print_import_plan_summary(plan)
+    if not plan["create"] and not plan["update"]:
+        console.print("[green]Nothing to apply, the plan has no changes.[/green]")
+        return
+
+    with db_connection(DATABASE_PATH) as db:
+        problems = check_import_plan(db, plan)
+    if problems:
+        feedback_message(
+            "The plan is out of date:\n" + "\n".join(problems[:10]), "error"
+        )
+        raise typer.Exit(1)
+
+    create_snapshot()
+
+    try:
+        rows = stage_preset_rows(
+            plan["update"],
+            plan["create"],
+            {
+                (update["name"], update["type"]): (update["id"],)
+                for update in plan["update"]
+            },
+        )
+        with db_connection(DATABASE_PATH) as db:
+            # Checked again under the write lock, so nothing can change between
+            # verifying the plan and applying it
+            db.execute("BEGIN IMMEDIATE")
+            with db:
+                problems = check_import_plan(db, plan)
+                if problems:
+                    raise ValueError(
+                        "the plan is out of date: " + "; ".join(problems[:5])
+                    )
+                start = time.perf_counter()
+                bulk_upsert_presets(db.cursor(), rows)
+                elapsed = time.perf_counter() - start
+    except Exception as e:
+        console.print(f"[bold red]Error applying plan:[/bold red] {str(e)}")
+        console.print("[yellow]No changes were made.[/yellow]")
+        raise typer.Exit(1)
+
+    console.print(
+        f"[green]Plan applied. Created {len(plan['create'])} new presets and updated {len(plan['update'])} existing presets.[/green]"
+    )
+    console.print(
+        f"[dim]Wrote {len(rows)} rows in {elapsed:.3f}s ({rows_per_second(len(rows), elapsed)} rows/s)[/dim]"
+    )
+
+
+UPSERT_PRESET_QUERY = """
+    INSERT INTO style_presets (id, name, preset_data, type, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        preset_data = excluded.preset_data,
+        type = excluded.type,
+        updated_at = excluded.updated_at
+"""
+
+
+def encode_preset_data(preset_data: Any) -> str:
+    # Avoid double JSON encoding - serialize only if it's a dictionary
     if isinstance(preset_data, dict):
-        preset_data = json.dumps(preset_data)
-    cursor.execute(
-        "UPDATE style_presets SET preset_data = ?, type = ?, updated_at = ? WHERE name = ?",
-        (preset_data, preset["type"], datetime.now().isoformat(), preset["name"]),
+        return json.dumps(preset_data)
+    return preset_data
+
+
+def stage_preset_rows(
+    presets_to_update: List[Dict[str, Any]],
+    presets_to_create: List[Dict[str, Any]],
+    existing_presets: Dict[Tuple[str, str], Any],
+) -> List[Tuple[str, str, str, str, str, str]]:
+    # One timestamp for the whole batch; updates keep their existing id so the
+    # upsert resolves on the primary key (style_presets.name is not unique)
+    now = datetime.now().isoformat()
+    rows = []
+    for preset in presets_to_update:
+        preset_id = existing_presets[preset["name"], preset["type"]][0]
+        rows.append(
+            (
+                preset_id,
+                preset["name"],
+                encode_preset_data(preset["preset_data"]),
+                preset["type"],
+                now,
+                now,
+            )
+        )
+    for preset in presets_to_create:
+        rows.append(
+            (
+                str(uuid.uuid4()),
+                preset["name"],
+                encode_preset_data(preset["preset_data"]),
+                preset["type"],
+                now,
+                now,
+            )
+        )
+    return rows
+
+
+def bulk_upsert_presets(
+    cursor: sqlite3.Cursor, rows: List[Tuple[str, str, str, str, str, str]]
+) -> int:
+    if not rows:
+        return 0
+    cursor.executemany(UPSERT_PRESET_QUERY, rows)
+    return len(rows)
+
+
+def rows_per_second(count: int, elapsed: float) -> str:
+    if elapsed <= 0:
+        return "n/a"
+    return f"{count / elapsed:,.0f}"
+
+
+def render_presets_table(presets: List[Tuple[str, str, str, str]]) -> Table:
+    presets_table = create_table(
+        "",
+        [("ID", "yellow"), ("Name", "white"), ("Prompts", "white")],
     )
+    for preset in presets:
+        prompts_data = json.loads(preset[2])
+        prompts_formatted = f"[blue]Positive Prompt: {prompts_data['positive_prompt']}[/blue] \
+        \n[yellow]Negative Prompt: {prompts_data['negative_prompt']}[/yellow]"
+        presets_table.add_row(
+            preset[0],
+            preset[1],
+            prompts_formatted,
+        )
+    return presets_table
+
+
+PAGE_CACHE_SIZE = 8
 
+RenderedPage = Tuple[List[Tuple[str, str, str, str]], Table]
 
-def create_preset_without_trigger(
-    cursor: sqlite3.Cursor, preset: Dict[str, Any]
+
+class PresetPager:
+    # Pages are keyed by the position of their first row. All reads and
+    # rendering run on a single worker thread (which gets its own shared
+    # connection), so the neighbouring pages can be prepared while the current
+    # one is on screen.
+
+    def __init__(
+        self, condition: str, items_per_page: int, cache_size: int = PAGE_CACHE_SIZE
+    ) -> None:
+        self.condition = condition
+        self.items_per_page = items_per_page
+        self.cache_size = cache_size
+        self.pages: "OrderedDict[int, RenderedPage]" = OrderedDict()
+        self.pending: Dict[int, Future] = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="preset-pager"
+        )
+
+    def _load(
+        self,
+        after: Optional[PresetKey] = None,
+        before: Optional[PresetKey] = None,
+        offset: int = 0,
+    ) -> RenderedPage:
+        with db_connection(DATABASE_PATH) as db:
+            presets = get_presets_page(
+                db,
+                self.condition,
+                self.items_per_page,
+                after=after,
+                before=before,
+                offset=offset,
+            )
+        return presets, render_presets_table(presets)
+
+    def _remember(self, start: int, page: RenderedPage) -> RenderedPage:
+        self.pages[start] = page
+        self.pages.move_to_end(start)
+        while len(self.pages) > self.cache_size:
+            self.pages.popitem(last=False)
+        return page
+
+    def _request(self, start: int, **cursor: Any) -> Future:
+        if start not in self.pending:
+            self.pending[start] = self.executor.submit(self._load, **cursor)
+        return self.pending[start]
+
+    def get(self, start: int, **cursor: Any) -> RenderedPage:
+        if start in self.pages:
+            self.pages.move_to_end(start)
+            return self.pages[start]
+        page = self._request(start, **cursor).result()
+        self.pending.pop(start, None)
+        return self._remember(start, page)
+
+    def prefetch(self, start: int, total_presets: int) -> None:
+        presets, _ = self.pages[start]
+        if not presets:
+            return
+        next_start = start + len(presets)
+        if next_start < total_presets and next_start not in self.pages:
+            self._request(next_start, after=preset_key(presets[-1]))
+        previous_start = max(start - self.items_per_page, 0)
+        if start > 0 and previous_start not in self.pages:
+            self._request(previous_start, before=preset_key(presets[0]))
+
+    def close(self) -> None:
+        # The worker's shared connection is not covered by the atexit hook,
+        # which runs on the main thread, so the worker closes it itself
+        for future in self.pending.values():
+            future.cancel()
+        self.executor.submit(close_connections)
+        self.executor.shutdown(wait=True)
+
+
+class PresetChoices:
+    # Picker source over the live table: keyset pages while browsing, the FTS
+    # sidecar index once a search is entered
+
+    def __init__(self, preset_type: Optional[str] = None) -> None:
+        self.preset_type = preset_type
+        self.condition, self.params = preset_filter(preset_type=preset_type)
+        self.page_starts: Dict[int, Optional[PresetKey]] = {0: None}
+        self.total: Optional[int] = None
+        self.matches: Dict[str, List[Tuple[str, str, str]]] = {}
+        self.synced = False
+
+    def search(self, text: str) -> List[Tuple[str, str, str]]:
+        from .search import sync_search_index, match_presets
+
+        if text not in self.matches:
+            with search_index_connection() as index:
+                if not self.synced:
+                    sync_search_index(index, DATABASE_PATH)
+                    self.synced = True
+                self.matches[text] = match_presets(index, text, self.preset_type)
+        return self.matches[text]
+
+    def count(self, text: str) -> int:
+        if text:
+            return len(self.search(text))
+        if self.total is None:
+            with db_connection(DATABASE_PATH) as db:
+                self.total = count_presets(db, self.condition, self.params)
+        return self.total
+
+    def page(self, text: str, number: int, size: int) -> List[Tuple[str, str]]:
+        if text:
+            rows = self.search(text)[number * size : (number + 1) * size]
+            return [(f"{name} ({type})", preset_id) for preset_id, name, type in rows]
+
+        with db_connection(DATABASE_PATH) as db:
+            if self.page_starts.get(number) is not None:
+                presets = get_presets_page(
+                    db,
+                    self.condition,
+                    size,
+                    after=self.page_starts[number],
+                    params=self.params,
+                )
+            else:
+                presets = get_presets_page(
+                    db, self.condition, size, offset=number * size, params=self.params
+                )
+        if presets:
+            self.page_starts[number + 1] = preset_key(presets[-1])
+        return [(f"{p[1]} ({p[3]})", p[0]) for p in presets]
+
+    def keys(self, text: str) -> Set[str]:
+        if text:
+            return {preset_id for preset_id, _, _ in self.search(text)}
+        with db_connection(DATABASE_PATH) as db:
+            return {
+                row[0]
+                for row in db.execute(
+                    f"SELECT id FROM style_presets {self.condition}", self.params
+                )
+            }
+
+
+def page_label(start: int, shown: int, items_per_page: int, total_presets: int) -> str:
+    # --after/--before start at any preset, a page number is only exact while
+    # the shown page lines up with the page grid
+    total_pages = math.ceil(total_presets / items_per_page)
+    if start % items_per_page == 0 and (
+        shown == items_per_page or start + shown == total_presets
+    ):
+        return f"Page {start // items_per_page + 1} of {total_pages}"
+    return f"Presets {start + 1}-{start + shown} of {total_presets}"
+
+
+def display_presets(
+    show_defaults: bool,
+    show_all: bool,
+    show_project: bool,
+    page: int = 1,
+    items_per_page: int = 10,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
 ) -> None:
-    preset_id = str(uuid.uuid4())
-    now = datetime.now().isoformat()
-    preset_data = preset["preset_data"]
-    # Fix: Avoid double JSON encoding - serialize only if it's a dictionary
-    if isinstance(preset_data, dict):
-        preset_data = json.dumps(preset_data)
-    cursor.execute(
-        "INSERT INTO style_presets (id, name, preset_data, type, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
-        (preset_id, preset["name"], preset_data, preset["type"], now, now),
+    with db_connection(DATABASE_PATH) as db:
+        condition = get_presets_condition(show_defaults, show_all, show_project)
+
+        # Counted once for the whole browsing session
+        total_presets = count_presets(db, condition)
+
+        pager = PresetPager(condition, items_per_page)
+        try:
+            if after or before:
+                cursor = resolve_preset_cursor(db, condition, after or before)
+                if cursor is None:
+                    feedback_message(
+                        f"No preset named '{after or before}' found", "warning"
+                    )
+                    return
+                position = count_presets_before(db, condition, cursor)
+                if after:
+                    start = position + 1
+                    presets, presets_table = pager.get(start, after=cursor)
+                else:
+                    start = max(position - items_per_page, 0)
+                    presets, presets_table = pager.get(start, before=cursor)
+            else:
+                start = max(page - 1, 0) * items_per_page
+                presets, presets_table = pager.get(start, offset=start)
+
+            if not presets:
+                types = (
+                    " or ".join(
+                        t
+                        for t, f in zip(
+                            ["default", "all", "project"],
+                            [show_defaults, show_all, show_project],
+                        )
+                        if f
+                    )
+                    or "user"
+                )
+                feedback_message(f"No presets found for {types}", "warning")
+                return
+
+            while True:
+                console.print(presets_table)
+                console.print(
+                    page_label(start, len(presets), items_per_page, total_presets)
+                )
+
+                if len(presets) >= total_presets:
+                    return
+
+                # Warm the neighbouring pages while the user reads this one
+                pager.prefetch(start, total_presets)
+
+                while True:
+                    choice = typer.prompt(
+                        "Enter 'n' for next page, 'p' for previous page, or 'q' to quit",
+                        default="q",
+                    )
+                    if choice.lower() == "n" and start + len(presets) < total_presets:
+                        start += len(presets)
+                        presets, presets_table = pager.get(
+                            start, after=preset_key(presets[-1])
+                        )
+                        break
+                    elif choice.lower() == "p" and start > 0:
+                        start = max(start - items_per_page, 0)
+                        presets, presets_table = pager.get(
+                            start, before=preset_key(presets[0])
+                        )
+                        break
+                    elif choice.lower() == "q":
+                        return
+                    else:
+                        console.print("Invalid choice. Please try again.")
+        finally:
+            pager.close()
+
+
+EXPORT_FORMATS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def export_presets() -> None:
+    import inquirer
+
+    with db_connection(DATABASE_PATH) as db:
+        total_presets = count_presets(db, "")
+    if not total_presets:
+        console.print("[yellow]No presets found to export.[/yellow]")
+        return
+
+    export_source = inquirer.list_input(
+        "Select export source",
+        choices=["Export selected", "Export all", "Cancel"],
     )
 
+    if export_source == "Cancel":
+        console.print("Export cancelled.")
+        return
 
-def convert_preset_format(preset: Dict[str, Any], project_type) -> Dict[str, Any]:
-    if "preset_data" in preset:
-        # Already in the correct format
-        return preset
+    selected_ids = None
+    if export_source == "Export selected":
+        selected_ids = pick(PresetChoices(), "Select presets to export")
+        if not selected_ids:
+            console.print("Export cancelled.")
+            return
 
-    # Convert from the new format to the database format
-    return {
-        "name": preset["name"],
-        "type": (
-            "project" if project_type else preset.get("type", "user")
-        ),  # Default to 'user' if not specified
-        "preset_data": {
-            "positive_prompt": preset.get("positive_prompt", preset.get("prompt", "")),
-            "negative_prompt": preset.get("negative_prompt", ""),
-        },
-    }
+    export_filename = inquirer.text(
+        message="Enter the export filename (.json or .jsonl, optionally .gz or .zst)"
+    )
+    export_path = (
+        export_filename if export_format(export_filename) else f"{export_filename}.json"
+    )
+    try:
+        with db_connection(DATABASE_PATH) as db:
+            start = time.perf_counter()
+            rows = write_presets_export(
+                db, *preset_filter(ids=selected_ids), export_path=export_path
+            )
+            elapsed = time.perf_counter() - start
+        console.print(f"[green]Presets exported successfully to {export_path}[/green]")
+        console.print(
+            f"[green]{rows} presets, {format_size(os.path.getsize(export_path))} "
+            f"in {elapsed:.2f}s ({rows_per_second(rows, elapsed)} rows/s)[/green]"
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error exporting presets:[/bold red] {str(e)}")
+
+
+def export_presets_to_file(
+    export_path: str,
+    preset_type: Optional[str] = None,
+    match: Optional[str] = None,
+    since: Optional[str] = None,
+) -> None:
+    # Non-interactive export, the filters and the JSON are both left to SQLite
+    if since:
+        try:
+            since = datetime.fromisoformat(since).isoformat(sep=" ")
+        except ValueError:
+            feedback_message(
+                f"Invalid --since date '{since}', use YYYY-MM-DD or YYYY-MM-DD HH:MM:SS.",
+                "error",
+            )
+            return
+    if not export_format(export_path):
+        export_path = f"{export_path}.json"
+
+    condition, params = preset_filter(preset_type=preset_type, match=match, since=since)
+    try:
+        with db_connection(DATABASE_PATH) as db:
+            start = time.perf_counter()
+            rows = write_presets_export(
+                db, condition, params, export_path=export_path, pretty=False
+            )
+            elapsed = time.perf_counter() - start
+    except Exception as e:
+        console.print(f"[bold red]Error exporting presets:[/bold red] {str(e)}")
+        return
+
+    if not rows:
+        console.print(
+            f"[yellow]No presets matched, wrote an empty {export_path}[/yellow]"
+        )
+        return
+    console.print(
+        f"[green]{rows} presets exported to {export_path}, "
+        f"{format_size(os.path.getsize(export_path))} in {elapsed:.2f}s "
+        f"({rows_per_second(rows, elapsed)} rows/s)[/green]"
+    )
 
 
-def validate_preset(preset: Dict[str, Any]) -> bool:
-    if "name" not in preset:
-        return False
+def export_format(export_path: str) -> Optional[str]:
+    # Format from the extension under any compression suffix
+    base = export_path
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if base.endswith(suffix):
+            base = base[: -len(suffix)]
+    return EXPORT_FORMATS.get(os.path.splitext(base)[1].lower())
+
+
+def write_presets_export(
+    db: sqlite3.Connection,
+    condition: str,
+    params: Dict[str, Any],
+    export_path: str,
+    pretty: bool = True,
+) -> int:
+    # Rows go from the cursor straight to the (compressed) file, so memory use
+    # does not depend on how many presets are exported
+    export_type = export_format(export_path) or "json"
+    order = f"ORDER BY {PRESET_SORT_KEY}"
+    rows = 0
+    with open_text_output(export_path, compression_for(export_path)) as f:
+        if export_type == "jsonl" or not pretty:
+            # SQLite builds each item itself, preset_data is never decoded. A
+            # compact .json export is the same items, one per line in a list
+            cursor = db.execute(
+                "SELECT json_object('name', name, 'type', type, 'preset_data', json(preset_data)) "
+                f"FROM style_presets {condition} {order}",
+                params,
+            )
+            if export_type == "jsonl":
+                for (line,) in cursor:
+                    f.write(line)
+                    f.write("\n")
+                    rows += 1
+                return rows
+            for (item,) in cursor:
+                f.write("[\n" if rows == 0 else ",\n")
+                f.write(item)
+                rows += 1
+            f.write("\n]\n" if rows else "[]\n")
+            return rows
+
+        # Same layout json.dump(indent=2) gives the whole list, one item at a time
+        cursor = db.execute(
+            f"SELECT name, type, preset_data FROM style_presets {condition} {order}",
+            params,
+        )
+        for name, type, preset_data in cursor:
+            item = {"name": name, "type": type, "preset_data": json.loads(preset_data)}
+            f.write("[\n" if rows == 0 else ",\n")
+            f.write(textwrap.indent(json.dumps(item, indent=2), "  "))
+            rows += 1
+        f.write("\n]" if rows else "[]")
+    return rows
+
 
-    if "preset_data" in preset:
-        # Validate the old structure
-        if not isinstance(preset["preset_data"], dict):
-            return False
-        # Ensure positive_prompt and negative_prompt exist, but don't add if not present
-        if (
-            "prompt" in preset["preset_data"]
-            and "positive_prompt" not in preset["preset_data"]
+DELETE_PREVIEW = 10
+
+
+def stage_delete_targets(db: sqlite3.Connection, values: Iterable[str]) -> None:
+    # Duplicates collapse on the primary key, so every target is stored once
+    db.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS delete_targets (value TEXT PRIMARY KEY) WITHOUT ROWID"
+    )
+    db.execute("DELETE FROM temp.delete_targets")
+    db.executemany(
+        "INSERT OR IGNORE INTO temp.delete_targets VALUES (?)",
+        ((value,) for value in values),
+    )
+
+
+def delete_targets_filter(
+    column: str, preset_type: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    # Each staged target is looked up through the (type, name, id) index or
+    # the primary key, which keeps the join linear in the number of targets
+    condition, params = preset_filter(preset_type=preset_type)
+    condition = extend_condition(
+        condition, f"{column} IN (SELECT value FROM temp.delete_targets)"
+    )
+    return condition, params
+
+
+def plan_preset_deletion(
+    db: sqlite3.Connection,
+    column: str,
+    values: Iterable[str],
+    preset_type: Optional[str] = "user",
+) -> Tuple[int, List[str]]:
+    # Dry run: how many presets the delete would remove and the first few names
+    with db:
+        stage_delete_targets(db, values)
+        condition, params = delete_targets_filter(column, preset_type)
+        count = db.execute(
+            f"SELECT COUNT(*) FROM style_presets {condition}", params
+        ).fetchone()[0]
+        preview = [
+            name
+            for (name,) in db.execute(
+                f"SELECT name FROM style_presets {condition} "
+                f"ORDER BY {PRESET_SORT_KEY} LIMIT {DELETE_PREVIEW}",
+                params,
+            )
+        ]
+    return count, preview
+
+
+def delete_staged_presets(
+    db: sqlite3.Connection,
+    column: str,
+    values: Iterable[str],
+    preset_type: Optional[str] = "user",
+) -> int:
+    # Targets are staged again inside the delete transaction, so the rows
+    # removed are exactly the ones matching at commit time
+    with db:
+        stage_delete_targets(db, values)
+        condition, params = delete_targets_filter(column, preset_type)
+        return db.execute(f"DELETE FROM style_presets {condition}", params).rowcount
+
+
+def delete_presets(dry_run: bool = False) -> None:
+    import inquirer
+
+    delete_source = inquirer.list_input(
+        "Select delete source",
+        choices=["Select from list", "Import from file", "Import from URL", "Cancel"],
+    )
+
+    if delete_source == "Cancel":
+        console.print("Deletion cancelled.")
+        return
+
+    if delete_source == "Select from list":
+        selected_ids = pick(PresetChoices("user"), "Select presets to delete")
+        if not selected_ids:
+            console.print("No presets selected for deletion.")
+            return
+        column, targets = "id", list(selected_ids)
+    elif delete_source in ["Import from file", "Import from URL"]:
+        preset_names = []
+        if delete_source == "Import from file":
+            file_path = inquirer.text(message="Enter the path to the JSON file")
+            try:
+                with open(file_path, "r") as f:
+                    preset_names = json.load(f)
+            except Exception as e:
+                console.print(f"[bold red]Error reading file:[/bold red] {str(e)}")
+                return
+        else:
+            # Import from URL
+            url = inquirer.text(message="Enter the URL of the JSON file")
+            result = fetch_json_sources([url], json.loads, "json:1")[0]
+            if result["error"]:
+                console.print(f"[bold red]Error:[/bold red] {result['error']}")
+                return
+            preset_names = result["data"]
+
+        if not isinstance(preset_names, list) or not all(
+            isinstance(name, str) for name in preset_names
         ):
-            preset["preset_data"]["positive_prompt"] = preset["preset_data"].pop(
-                "prompt"
+            console.print(
+                "[bold red]Error:[/bold red] Invalid JSON format. Expected a list of preset names."
             )
-        preset["preset_data"].setdefault("positive_prompt", "")
-        preset["preset_data"].setdefault("negative_prompt", "")
-    elif "positive_prompt" in preset or "prompt" in preset:
-        # Validate the new structure
-        if "prompt" in preset and "positive_prompt" not in preset:
-            preset["positive_prompt"] = preset.pop("prompt")
-        preset.setdefault("positive_prompt", "")
-        preset.setdefault("negative_prompt", "")
+            return
+        column, targets = "name", preset_names
     else:
-        return False
+        return
+
+    with db_connection(DATABASE_PATH) as db:
+        count, preview = plan_preset_deletion(db, column, targets)
+
+    if not count:
+        console.print("[yellow]No presets found to delete.[/yellow]")
+        return
+
+    preset_names = ", ".join(preview)
+    if count > len(preview):
+        preset_names += f" and {count - len(preview)} more"
+    if dry_run:
+        console.print(
+            f"[yellow]Dry run:[/yellow] {count} presets would be deleted: {preset_names}"
+        )
+        return
+
+    # Confirmation
+    confirm = inquirer.confirm(
+        f"Are you sure you want to delete the following presets: {preset_names}? This action is irreversible."
+    )
+
+    if not confirm:
+        console.print("Deletion cancelled.")
+        return
+
+    # Create a snapshot before making changes
+    create_snapshot()
+
+    # Perform deletion
+    try:
+        with db_connection(DATABASE_PATH) as db:
+            deleted = delete_staged_presets(db, column, targets)
+        console.print(f"[green]Successfully deleted {deleted} presets.[/green]")
+    except Exception as e:
+        console.print(f"[bold red]Error during deletion:[/bold red] {str(e)}")
+        console.print("[yellow]All changes have been rolled back.[/yellow]")
+
+
+def render_search_snippet(snippet: Optional[str]) -> str:
+    from rich.markup import escape
+
+    from .search import HIGHLIGHT_START, HIGHLIGHT_END
+
+    return (
+        escape(snippet or "")
+        .replace(HIGHLIGHT_START, "[bold yellow]")
+        .replace(HIGHLIGHT_END, "[/bold yellow]")
+    )
+
+
+@contextmanager
+def search_index_connection() -> Iterator[sqlite3.Connection]:
+    from .search import init_search_index
+
+    os.makedirs(os.path.dirname(SEARCH_INDEX_PATH), exist_ok=True)
+    with db_connection(SEARCH_INDEX_PATH) as index:
+        init_search_index(index)
+        yield index
+
+
+def search_presets(
+    text: str, preset_type: Optional[str] = None, limit: int = 20
+) -> None:
+    from .search import sync_search_index, search_index
+
+    try:
+        with search_index_connection() as index:
+            indexed, removed = sync_search_index(index, DATABASE_PATH)
+            start = time.perf_counter()
+            results = search_index(index, text, preset_type, limit)
+            elapsed = time.perf_counter() - start
+    except sqlite3.OperationalError as e:
+        feedback_message(f"Search is unavailable: {str(e)}", "error")
+        return
+
+    if indexed or removed:
+        console.print(
+            f"[dim]Search index updated: {indexed} indexed, {removed} dropped.[/dim]"
+        )
+    if not results:
+        feedback_message(f"No presets found for '{text}'.", "warning")
+        return
+
+    results_table = create_table(
+        f"Search: {text}",
+        [("Name", "white"), ("Type", "yellow dim"), ("Match", "white")],
+    )
+    for result in results:
+        results_table.add_row(
+            result["name"], result["type"], render_search_snippet(result["snippet"])
+        )
+    console.print(results_table)
+    console.print(f"[dim]{len(results)} result(s) in {elapsed * 1000:.1f} ms[/dim]")
+
+
+DEDUPE_NAMES_SHOWN = 5
+
+
+@contextmanager
+def signature_cache_connection() -> Iterator[sqlite3.Connection]:
+    from .dedupe import init_signature_cache
+
+    os.makedirs(os.path.dirname(SIGNATURES_PATH), exist_ok=True)
+    with db_connection(SIGNATURES_PATH) as cache:
+        init_signature_cache(cache)
+        yield cache
+
+
+def dedupe_presets(
+    threshold: float = 0.8, preset_type: Optional[str] = None, remove: bool = False
+) -> None:
+    import inquirer
+
+    from .dedupe import sync_signatures, find_duplicate_clusters
+
+    if not 0 < threshold <= 1:
+        feedback_message("The threshold has to be between 0 and 1.", "error")
+        return
+
+    try:
+        with signature_cache_connection() as cache:
+            start = time.perf_counter()
+            hashed, removed = sync_signatures(cache, DATABASE_PATH)
+            clusters = find_duplicate_clusters(
+                cache, DATABASE_PATH, threshold, preset_type
+            )
+            elapsed = time.perf_counter() - start
+    except sqlite3.OperationalError as e:
+        feedback_message(f"Duplicate detection is unavailable: {str(e)}", "error")
+        return
+
+    if hashed or removed:
+        console.print(
+            f"[dim]Signatures updated: {hashed} hashed, {removed} dropped.[/dim]"
+        )
+    if not clusters:
+        feedback_message(
+            f"No near-duplicate presets found at {threshold:.0%} similarity.", "info"
+        )
+        return
+
+    # The first preset of a cluster is the one kept, the rest are duplicates
+    duplicates = [
+        member["id"]
+        for members in clusters
+        for member in members[1:]
+        if member["type"] == "user"
+    ]
+    clusters_table = create_table(
+        f"Near-duplicates ({threshold:.0%} similar)",
+        [("Keep", "green"), ("Duplicates", "white"), ("Count", "yellow dim")],
+    )
+    for members in clusters:
+        names = [f"{m['name']} ({m['type']})" for m in members[1:]]
+        shown = ", ".join(names[:DEDUPE_NAMES_SHOWN])
+        if len(names) > DEDUPE_NAMES_SHOWN:
+            shown += f" and {len(names) - DEDUPE_NAMES_SHOWN} more"
+        clusters_table.add_row(
+            f"{members[0]['name']} ({members[0]['type']})", shown, str(len(names))
+        )
+    console.print(clusters_table)
+    console.print(
+        f"[dim]{len(clusters)} cluster(s), {len(duplicates)} removable user preset(s) "
+        f"in {elapsed:.2f}s[/dim]"
+    )
+
+    if not remove or not duplicates:
+        return
+    confirm = inquirer.confirm(
+        f"Delete {len(duplicates)} duplicate user presets, keeping one per cluster? "
+        "A snapshot is taken first."
+    )
+    if not confirm:
+        console.print("Deletion cancelled.")
+        return
+
+    create_snapshot()
+    try:
+        with db_connection(DATABASE_PATH) as db:
+            deleted = delete_staged_presets(db, "id", duplicates)
+        console.print(
+            f"[green]Successfully deleted {deleted} duplicate presets.[/green]"
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error during deletion:[/bold red] {str(e)}")
+        console.print("[yellow]All changes have been rolled back.[/yellow]")
 
-    # Ensure 'type' is present
-    preset.setdefault("type", "user")
 
-    return True
+# A synced directory replaces every preset of its type, InvokeAI's own default
+# presets are never handed over to a directory
+SYNC_TYPES = ("user", "project")
+
+
+def merge_scanned_files(
+    scanned: List[Tuple[str, List[PresetRecord], List[PresetError]]],
+    preset_type: str,
+) -> Tuple[List[PresetRecord], List[PresetError]]:
+    # Files are read in path order and the first file to define a name wins,
+    # every preset takes the type the directory is synced as
+    records: List[PresetRecord] = []
+    errors: List[PresetError] = []
+    first_seen: Dict[str, str] = {}
+    for path, file_records, file_errors in scanned:
+        errors.extend(file_errors)
+        for record in file_records:
+            if record.name in first_seen:
+                errors.append(
+                    PresetError(
+                        "$",
+                        f"duplicate of a preset in {first_seen[record.name]}",
+                        record.name,
+                        path,
+                    )
+                )
+                continue
+            first_seen[record.name] = path
+            records.append(record._replace(type=preset_type))
+    return records, errors
+
+
+def plan_directory_sync(
+    directory: str, preset_type: str = "user", paths: Optional[Iterable[str]] = None
+) -> Tuple[Dict[str, Any], List[PresetError], Dict[str, int]]:
+    from .sync import init_scan_cache, scan_directory
+
+    os.makedirs(os.path.dirname(SYNC_SCAN_PATH), exist_ok=True)
+    with db_connection(SYNC_SCAN_PATH) as cache:
+        init_scan_cache(cache)
+        scanned, stats = scan_directory(cache, directory, paths)
+    records, errors = merge_scanned_files(scanned, preset_type)
+
+    existing_presets = build_preset_index(preset_type)
+    creates, updates, noops = classify_records(records, existing_presets)
+    wanted = {record.name for record in records}
+    deletes = [
+        (preset_id, name)
+        for (name, _), (preset_id, _, _) in existing_presets.items()
+        if name not in wanted
+    ]
+    # A file that cannot be parsed says nothing about its presets, deleting
+    # them because of a syntax error would lose work
+    unreadable = {
+        error.source for error in errors if error.path == "$" and not error.name
+    }
+    if unreadable and deletes:
+        stats["deletes_held"] = len(deletes)
+        deletes = []
+    return (
+        {
+            "create": creates,
+            "update": updates,
+            "delete": deletes,
+            "noop": noops,
+            "existing": existing_presets,
+        },
+        errors,
+        stats,
+    )
 
 
-def display_presets(
-    show_defaults: bool,
-    show_all: bool,
-    show_project: bool,
-    page: int = 1,
-    items_per_page: int = 10,
+def apply_directory_sync(
+    db: sqlite3.Connection, changes: Dict[str, Any], preset_type: str
+) -> Tuple[int, int]:
+    # Creates, updates and deletes go in together or not at all
+    rows = stage_preset_rows(
+        [record.as_preset() for record in changes["update"]],
+        [record.as_preset() for record in changes["create"]],
+        changes["existing"],
+    )
+    deleted = 0
+    with db:
+        bulk_upsert_presets(db.cursor(), rows)
+        if changes["delete"]:
+            stage_delete_targets(db, [preset_id for preset_id, _ in changes["delete"]])
+            condition, params = delete_targets_filter("id", preset_type)
+            deleted = db.execute(
+                f"DELETE FROM style_presets {condition}", params
+            ).rowcount
+    return len(rows), deleted
+
+
+def sync_presets(
+    directory: str, preset_type: str = "user", dry_run: bool = False
 ) -> None:
-    total_presets, presets = get_presets_list(
-        show_defaults, show_all, show_project, page, items_per_page
+    if not os.path.isdir(directory):
+        feedback_message(f"{directory} is not a directory.", "error")
+        return
+    if preset_type not in SYNC_TYPES:
+        feedback_message(
+            f"Cannot sync '{preset_type}' presets, use one of {', '.join(SYNC_TYPES)}.",
+            "error",
+        )
+        return
+
+    start = time.perf_counter()
+    changes, errors, stats = plan_directory_sync(directory, preset_type)
+    elapsed = time.perf_counter() - start
+
+    console.print(
+        f"[dim]Scanned {stats['files']} files ({stats['hashed']} hashed, "
+        f"{stats['parsed']} parsed, {stats['removed']} gone) in {elapsed:.2f}s[/dim]"
     )
-    total_pages = math.ceil(total_presets / items_per_page)
+    report_validation_errors(errors)
+    if stats.get("deletes_held"):
+        feedback_message(
+            f"{stats['deletes_held']} deletions held back until every file parses.",
+            "warning",
+        )
 
-    presets_table = create_table(
-        "",
-        [("ID", "yellow"), ("Name", "white"), ("Prompts", "white")],
+    summary_table = create_table(
+        f"Sync {directory} -> {preset_type} presets",
+        [("Action", "white"), ("Presets", "yellow")],
     )
+    for action in ("create", "update", "delete", "noop"):
+        summary_table.add_row(action, str(len(changes[action])))
+    console.print(summary_table)
 
-    if not presets:
-        types = (
-            " or ".join(
-                t
-                for t, f in zip(
-                    ["default", "all", "project"],
-                    [show_defaults, show_all, show_project],
-                )
-                if f
-            )
-            or "user"
+    if not changes["create"] and not changes["update"] and not changes["delete"]:
+        if not stats.get("deletes_held"):
+            console.print("[green]The database is already in sync.[/green]")
+        return
+    if not changes["create"] and not changes["update"] and not changes["noop"]:
+        # An empty directory would otherwise delete every preset of the type
+        feedback_message(
+            f"No presets found in {directory}, refusing to delete every {preset_type} preset.",
+            "error",
         )
-        feedback_message(f"No presets found for {types}", "warning")
+        return
+    if dry_run:
+        console.print("[yellow]Dry run, nothing was written.[/yellow]")
         return
 
-    for preset in presets:
-        prompts_data = json.loads(preset[2])
-        prompts_formatted = f"[blue]Positive Prompt: {prompts_data['positive_prompt']}[/blue] \
-        \n[yellow]Negative Prompt: {prompts_data['negative_prompt']}[/yellow]"
-        presets_table.add_row(
-            preset[0],
-            preset[1],
-            prompts_formatted,
+    create_snapshot()
+    try:
+        with db_connection(DATABASE_PATH) as db:
+            written, deleted = apply_directory_sync(db, changes, preset_type)
+        console.print(
+            f"[green]Sync complete. Wrote {written} presets and deleted {deleted}.[/green]"
         )
+    except Exception as e:
+        console.print(f"[bold red]Error during sync:[/bold red] {str(e)}")
+        console.print("[yellow]All changes have been rolled back.[/yellow]")
 
-    console.print(presets_table)
-    console.print(f"Page {page} of {total_pages}")
-
-    if total_pages > 1:
-        while True:
-            choice = typer.prompt(
-                "Enter 'n' for next page, 'p' for previous page, or 'q' to quit",
-                default="q",
-            )
-            if choice.lower() == "n" and page < total_pages:
-                page += 1
-                display_presets(
-                    show_defaults, show_all, show_project, page, items_per_page
-                )
-                break
-            elif choice.lower() == "p" and page > 1:
-                page -= 1
-                display_presets(
-                    show_defaults, show_all, show_project, page, items_per_page
-                )
-                break
-            elif choice.lower() == "q":
-                break
-            else:
-                console.print("Invalid choice. Please try again.")
 
+def watch_presets(
+    directory: str, preset_type: str = "user", poll: bool = False
+) -> None:
+    from .watch import open_watcher, collect_changes, InotifyWatcher
 
-def export_presets() -> None:
-    presets = get_presets_list(show_defaults=False, show_all=True, show_project=False)
-    if not presets:
-        console.print("[yellow]No presets found to export.[/yellow]")
+    # One full sync (and snapshot) up front, after that every batch of file
+    # events is applied on its own without another snapshot
+    sync_presets(directory, preset_type)
+    if not os.path.isdir(directory) or preset_type not in SYNC_TYPES:
         return
 
-    export_source = inquirer.list_input(
-        "Select export source",
-        choices=["Export selected", "Export all", "Cancel"],
+    watcher = open_watcher(directory, poll)
+    method = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    console.print(
+        f"[green]Watching {directory} ({method}), press Ctrl+C to stop.[/green]"
     )
-
-    if export_source == "Cancel":
-        console.print("Export cancelled.")
-        return
-
-    if export_source == "Export all":
-        selected_presets = presets
-    elif export_source == "Export selected":
-        # Create choices for the inquirer prompt
-        # return print(presets[:5])
-        choices = [f"{preset[1]} (ID: {preset[0]})" for preset in presets[1]]
-        questions = [
-            inquirer.Checkbox(
-                "selected_presets", message="Select presets to export", choices=choices
+    rescan = False
+    try:
+        while True:
+            changes = collect_changes(watcher)
+            if rescan:
+                # The last batch failed, so the whole tree is looked at again
+                changes, rescan = None, False
+            if changes is not None and not changes:
+                continue
+            start = time.perf_counter()
+            try:
+                plan, errors, stats = plan_directory_sync(
+                    directory, preset_type, changes
+                )
+                if changes is not None:
+                    errors = [error for error in errors if error.source in changes]
+                report_validation_errors(errors)
+                if not plan["create"] and not plan["update"] and not plan["noop"]:
+                    plan["delete"] = []
+                if plan["create"] or plan["update"] or plan["delete"]:
+                    with db_connection(DATABASE_PATH) as db:
+                        written, deleted = apply_directory_sync(db, plan, preset_type)
+                else:
+                    written, deleted = 0, 0
+            except (sqlite3.Error, OSError) as e:
+                # InvokeAI holding the database lock or a file vanishing
+                # mid-scan is not fatal, the batch is retried with a rescan
+                console.print(
+                    f"[dim]{datetime.now():%H:%M:%S}[/dim] "
+                    f"[bold red]Sync failed:[/bold red] {str(e)}, "
+                    "retrying with a full rescan"
+                )
+                rescan = True
+                continue
+            elapsed = time.perf_counter() - start
+            touched = stats["files"] if changes is None else len(changes)
+            console.print(
+                f"[dim]{datetime.now():%H:%M:%S}[/dim] {touched} file(s): "
+                f"wrote {written} ({len(plan['create'])} created, "
+                f"{len(plan['update'])} updated), {deleted} deleted "
+                f"in {elapsed * 1000:.0f} ms"
             )
-        ]
-        answers = inquirer.prompt(questions)
-        if not answers or not answers["selected_presets"]:
-            console.print("Export cancelled.")
-            return
-        selected_presets = [
-            preset
-            for preset in presets[1]
-            if f"{preset[1]} (ID: {preset[0]})" in answers["selected_presets"]
-        ]
-
-    export_data = []
-    for preset in selected_presets:
-        # Fix: Decode preset_data when exporting
-        export_data.append(
-            {
-                "name": preset[1],
-                "type": preset[3],
-                "preset_data": json.loads(preset[2]),  # Decode for export
-            }
-        )
+    except KeyboardInterrupt:
+        console.print("Stopped watching.")
+    finally:
+        watcher.close()
 
-    export_filename = inquirer.text(
-        message="Enter the export filename (without extension)"
-    )
-    export_path = f"{export_filename}.json"
-    try:
-        with open(export_path, "w") as f:
-            json.dump(export_data, f, indent=2)
-        console.print(f"[green]Presets exported successfully to {export_path}[/green]")
-    except Exception as e:
-        console.print(f"[bold red]Error exporting presets:[/bold red] {str(e)}")
 
+# ANCHOR: PRESET FUNCTIONS END
 
-def delete_presets() -> None:
-    db = get_db(DATABASE_PATH, connection=True)
-    delete_source = inquirer.list_input(
-        "Select delete source",
-        choices=["Select from list", "Import from file", "Import from URL", "Cancel"],
-    )
 
-    if delete_source == "Cancel":
-        console.print("Deletion cancelled.")
-        return
+# ANCHOR: DATABASE FUNCTIONS START
 
-    presets_to_delete = []
+# "presets" snapshots hold only the style_presets table (schema, indexes,
+# triggers and rows), "full" snapshots are a backup of the whole invokeai.db
+SNAPSHOT_SCOPES = ("presets", "full")
+RESTORE_PAGE_STEP = 1024
+CONFLICT_POLICIES = ("skip", "replace")
+PRESETS_TABLE = "style_presets"
 
-    if delete_source == "Select from list":
-        all_presets = get_presets_list(
-            show_defaults=False, show_all=False, show_project=False
-        )
-        # Assume all_presets[1] is the actual list of presets
-        choices = [f"{preset[1]} (ID: {preset[0]})" for preset in all_presets[1]]
-        questions = [
-            inquirer.Checkbox(
-                "selected_presets", message="Select presets to delete", choices=choices
-            )
-        ]
-        answers = inquirer.prompt(questions)
 
-        if not answers or not answers["selected_presets"]:
-            console.print("No presets selected for deletion.")
-            return
+def snapshot_scope(snapshot: Dict[str, str]) -> str:
+    # Snapshots recorded before scopes existed are full database copies
+    return snapshot.get("scope", "full")
 
-        presets_to_delete = [
-            preset
-            for preset in all_presets[1]
-            if f"{preset[1]} (ID: {preset[0]})" in answers["selected_presets"]
-        ]
-    elif delete_source in ["Import from file", "Import from URL"]:
-        preset_names = []
-        if delete_source == "Import from file":
-            file_path = inquirer.text(message="Enter the path to the JSON file")
-            try:
-                with open(file_path, "r") as f:
-                    preset_names = json.load(f)
-            except Exception as e:
-                console.print(f"[bold red]Error reading file:[/bold red] {str(e)}")
-                return
-        else:
-            # Import from URL
-            url = inquirer.text(message="Enter the URL of the JSON file")
-            try:
-                response = httpx.get(url)
-                response.raise_for_status()
-                preset_names = response.json()
-            except Exception as e:
-                console.print(f"[bold red]Error fetching from URL:[/bold red] {str(e)}")
-                return
 
-        if not isinstance(preset_names, list):
-            console.print(
-                "[bold red]Error:[/bold red] Invalid JSON format. Expected a list of preset names."
-            )
-            return
+def table_columns(
+    db: sqlite3.Connection, table: str, schema: str = "main"
+) -> List[str]:
+    return [row[1] for row in db.execute(f"PRAGMA {schema}.table_info({table})")]
 
-        user_presets = get_presets_list(
-            show_defaults=False, show_all=False, show_project=False
-        )
 
-        presets_to_delete = [
-            preset for preset in user_presets[1] if preset[1] in preset_names
-        ]
+def snapshot_presets_table(db: sqlite3.Connection, snapshot_path: str) -> int:
+    schema = db.execute(
+        "SELECT type, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL",
+        (PRESETS_TABLE,),
+    ).fetchall()
+    table_sql = [sql for type, sql in schema if type == "table"]
+    if not table_sql:
+        raise sqlite3.OperationalError(f"no such table: {PRESETS_TABLE}")
 
-    if not presets_to_delete:
-        console.print("[yellow]No presets found to delete.[/yellow]")
-        return
+    dest_conn = sqlite3.connect(snapshot_path)
+    try:
+        with dest_conn:
+            dest_conn.execute(table_sql[0])
+            dest_conn.execute(
+                "CREATE TABLE snapshot_meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            dest_conn.execute("INSERT INTO snapshot_meta VALUES ('scope', 'presets')")
+    finally:
+        dest_conn.close()
 
-    # Confirmation
-    preset_names = ", ".join([preset[1] for preset in presets_to_delete])
-    confirm = inquirer.confirm(
-        f"Are you sure you want to delete the following presets: {preset_names}? This action is irreversible."
-    )
+    columns = ", ".join(table_columns(db, PRESETS_TABLE))
+    db.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
+    try:
+        with db:
+            rows = db.execute(
+                f"INSERT INTO snapshot.{PRESETS_TABLE} ({columns}) SELECT {columns} FROM main.{PRESETS_TABLE}"
+            ).rowcount
+    finally:
+        db.execute("DETACH DATABASE snapshot")
 
-    if not confirm:
-        console.print("Deletion cancelled.")
-        return
+    # Indexes and triggers are cheaper to build once the rows are in place
+    dest_conn = sqlite3.connect(snapshot_path)
+    try:
+        with dest_conn:
+            for type, sql in schema:
+                if type in ("index", "trigger"):
+                    dest_conn.execute(sql)
+    finally:
+        dest_conn.close()
+    return rows
 
-    # Create a snapshot before making changes
-    create_snapshot()
 
-    # Perform deletion
+def restore_presets_table(db: sqlite3.Connection, snapshot_path: str) -> int:
+    db.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
     try:
+        live_columns = table_columns(db, PRESETS_TABLE)
+        snapshot_columns = set(table_columns(db, PRESETS_TABLE, "snapshot"))
+        columns = ", ".join(c for c in live_columns if c in snapshot_columns)
         with db:
-            # This automatically manages transactions
-            for preset in presets_to_delete:
-                db.execute("DELETE FROM style_presets WHERE id = ?", (preset[0],))
-        console.print(
-            f"[green]Successfully deleted {len(presets_to_delete)} presets.[/green]"
+            db.execute(f"DELETE FROM main.{PRESETS_TABLE}")
+            rows = db.execute(
+                f"INSERT INTO main.{PRESETS_TABLE} ({columns}) SELECT {columns} FROM snapshot.{PRESETS_TABLE}"
+            ).rowcount
+    finally:
+        db.execute("DETACH DATABASE snapshot")
+    return rows
+
+
+def restore_selected_presets(
+    db: sqlite3.Connection,
+    snapshot_path: str,
+    condition: str,
+    params: Dict[str, Any],
+    on_conflict: str = "skip",
+) -> Tuple[int, int]:
+    # A conflict is the same id, or the same name and type under another id
+    # (a preset that was deleted and imported again)
+    selected = f"FROM snapshot.{PRESETS_TABLE} AS s {condition}"
+    db.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
+    try:
+        live_columns = table_columns(db, PRESETS_TABLE)
+        snapshot_columns = set(table_columns(db, PRESETS_TABLE, "snapshot"))
+        columns = [c for c in live_columns if c in snapshot_columns]
+        insert = (
+            f"INSERT INTO main.{PRESETS_TABLE} ({', '.join(columns)}) "
+            f"SELECT {', '.join('s.' + c for c in columns)} {selected}"
         )
-    except Exception as e:
-        console.print(f"[bold red]Error during deletion:[/bold red] {str(e)}")
-        console.print("[yellow]All changes have been rolled back.[/yellow]")
-
+        with db:
+            matched = db.execute(f"SELECT COUNT(*) {selected}", params).fetchone()[0]
+            if on_conflict == "replace":
+                same_name = extend_condition(
+                    condition,
+                    "s.id != live.id AND s.name = live.name AND s.type = live.type",
+                )
+                db.execute(
+                    f"DELETE FROM main.{PRESETS_TABLE} AS live WHERE EXISTS "
+                    f"(SELECT 1 FROM snapshot.{PRESETS_TABLE} AS s {same_name})",
+                    params,
+                )
+                updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+                # The WHERE keeps the upsert clause from parsing as a join
+                statement = (
+                    f"{insert} {'AND' if condition else 'WHERE'} true "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}"
+                )
+            else:
+                statement = (
+                    f"{insert} {'AND' if condition else 'WHERE'} NOT EXISTS ("
+                    f"SELECT 1 FROM main.{PRESETS_TABLE} AS live "
+                    "WHERE live.id = s.id OR (live.name = s.name AND live.type = s.type))"
+                )
+            restored = db.execute(statement, params).rowcount
+    finally:
+        db.execute("DETACH DATABASE snapshot")
+    return matched, restored
 
-# ANCHOR: PRESET FUNCTIONS END
 
+def create_snapshot(scope: str = "presets") -> None:
+    try:
+        create_snapshot_directory()
+    except OSError as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        return
 
-# ANCHOR: DATABASE FUNCTIONS START
-def create_snapshot() -> None:
     if not os.access(SNAPSHOTS_DIR, os.W_OK):
         console.print(
             "[bold red]Error:[/bold red] No write permission for the snapshots directory."
@@ -580,59 +1912,130 @@ def create_snapshot() -> None:
 
     # Generate a human-readable timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    snapshot_name = f"{random_name()}_{timestamp.replace(':', '-')}.db"
+    raw_name = f"{random_name()}_{timestamp.replace(':', '-')}.db"
+    compression = default_compression()
+    snapshot_name = raw_name + COMPRESSION_SUFFIXES[compression]
     snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_name)
+    raw_path = os.path.join(SNAPSHOTS_DIR, f".{raw_name}.tmp")
 
     try:
         console.print("[green]Creating snapshot...[/green]")
 
-        # Use SQLite backup API
-        with (
-            get_db(DATABASE_PATH, connection=True) as source_conn,
-            sqlite3.connect(snapshot_path) as dest_conn,
-        ):
-            source_conn.backup(dest_conn)
+        with db_connection(DATABASE_PATH) as source_conn:
+            row_count, presets_hash = presets_content_hash(source_conn)
+            if scope == "presets":
+                snapshot_presets_table(source_conn, raw_path)
+            else:
+                # VACUUM INTO writes a compacted copy without the free pages
+                source_conn.execute("VACUUM INTO ?", (raw_path,))
+
+        raw_size = os.path.getsize(raw_path)
+        size = compress_file(raw_path, snapshot_path, compression)
+
+        with snapshot_catalog() as catalog:
+            add_snapshot(
+                catalog,
+                {
+                    "name": snapshot_name,
+                    "timestamp": timestamp,
+                    "path": snapshot_path,
+                    "scope": scope,
+                    "compression": compression,
+                    "size": size,
+                    "raw_size": raw_size,
+                    "row_count": row_count,
+                    "content_hash": presets_hash,
+                },
+            )
+            expired = prune_snapshots(catalog, **retention_policy())
+
+        for old_snapshot in expired:
+            if os.path.exists(old_snapshot["path"]):
+                os.remove(old_snapshot["path"])
+        if expired:
+            feedback_message(
+                f"Removed {len(expired)} expired snapshot(s): {', '.join(s['name'] for s in expired)}",
+                "info",
+            )
 
-        snapshots = load_snapshots()
-        snapshots.append(
-            {"name": snapshot_name, "timestamp": timestamp, "path": snapshot_path}
+        feedback_message(
+            f"Created snapshot: {snapshot_name} ({format_size(size)}, {format_size(raw_size)} uncompressed)",
+            "success",
         )
-
-        if len(snapshots) > int(SNAPSHOTS):
-            oldest_snapshot = snapshots.pop(0)
-            old_snapshot_path = os.path.join(SNAPSHOTS_DIR, oldest_snapshot["name"])
-            if os.path.exists(old_snapshot_path):
-                os.remove(old_snapshot_path)
-                feedback_message(
-                    f"Removed oldest snapshot: {oldest_snapshot['name']}", "info"
-                )
-
-        save_snapshots(snapshots)
-        feedback_message(f"Created snapshot: {snapshot_name}", "success")
     except sqlite3.Error as e:
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
         feedback_message(f"Error creating snapshot: {str(e)}", "error")
     except Exception as e:
         feedback_message(f"Error creating snapshot: {str(e)}", "error")
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
 
 
-def load_snapshots() -> List[Dict[str, str]]:
-    if os.path.exists(SNAPSHOTS_JSON):
+@contextmanager
+def snapshot_database_file(snapshot_path: str) -> Iterator[str]:
+    # SQLite can only open plain files, compressed snapshots are streamed out
+    # to a temporary file next to them for the duration of the restore
+    if compression_for(snapshot_path) == "none":
+        yield snapshot_path
+        return
+    fd, temp_path = tempfile.mkstemp(suffix=".db", dir=SNAPSHOTS_DIR)
+    os.close(fd)
+    try:
+        decompress_file(snapshot_path, temp_path)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+
+def retention_policy() -> Dict[str, int]:
+    def setting(value: str, default: int) -> int:
         try:
-            with open(SNAPSHOTS_JSON, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            console.print(
-                "[bold yellow]Warning:[/bold yellow] Snapshots file is corrupted. Starting with an empty list."
-            )
-    return []
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return default
+
+    return {
+        "keep_last": setting(SNAPSHOTS, 3),
+        "hourly": setting(SNAPSHOTS_HOURLY, 0),
+        "daily": setting(SNAPSHOTS_DAILY, 0),
+        "weekly": setting(SNAPSHOTS_WEEKLY, 0),
+    }
+
+
+def presets_content_hash(
+    db: sqlite3.Connection, schema: str = "main"
+) -> Tuple[int, str]:
+    digest = hashlib.sha1()
+    row_count = 0
+    cursor = db.execute(
+        f"SELECT id, name, type, preset_data FROM {schema}.{PRESETS_TABLE} ORDER BY id"
+    )
+    for row in cursor:
+        digest.update("\x1f".join(map(str, row)).encode("utf-8"))
+        digest.update(b"\x1e")
+        row_count += 1
+    return row_count, digest.hexdigest()
+
 
+@contextmanager
+def snapshot_catalog() -> Iterator[sqlite3.Connection]:
+    create_snapshot_directory()
+    with db_connection(SNAPSHOTS_CATALOG) as catalog:
+        init_catalog(catalog, SNAPSHOTS_JSON)
+        yield catalog
 
-def save_snapshots(snapshots: List[Dict[str, str]]) -> None:
+
+def load_snapshots() -> List[Dict[str, Any]]:
     try:
-        with open(SNAPSHOTS_JSON, "w") as f:
-            json.dump(snapshots, f, indent=2)
-    except Exception as e:
-        console.print(f"[bold red]Error saving snapshots metadata:[/bold red] {str(e)}")
+        with snapshot_catalog() as catalog:
+            return get_snapshots(catalog)
+    except (OSError, sqlite3.Error) as e:
+        console.print(
+            f"[bold yellow]Warning:[/bold yellow] Could not read the snapshot catalog: {str(e)}"
+        )
+    return []
 
 
 def list_snapshots() -> None:
@@ -643,16 +2046,37 @@ def list_snapshots() -> None:
 
     snapshots_table = create_table(
         "Database Snapshots",
-        [("Name", "white"), ("Timestamp", "yellow dim"), ("Path", "white")],
+        [
+            ("Name", "white"),
+            ("Timestamp", "yellow dim"),
+            ("Scope", "white"),
+            ("Rows", "white"),
+            ("Size", "green"),
+            ("Raw Size", "white"),
+            ("Path", "white"),
+        ],
     )
     for snapshot in snapshots:
+        size = snapshot.get("size")
+        if size is None and os.path.exists(snapshot["path"]):
+            size = os.path.getsize(snapshot["path"])
+        raw_size = snapshot.get("raw_size") or size
+        row_count = snapshot.get("row_count")
         snapshots_table.add_row(
-            snapshot["name"], snapshot["timestamp"], snapshot["path"]
+            snapshot["name"],
+            snapshot["timestamp"],
+            snapshot_scope(snapshot),
+            str(row_count) if row_count is not None else "-",
+            format_size(size) if size is not None else "-",
+            format_size(raw_size) if raw_size is not None else "-",
+            snapshot["path"],
         )
     console.print(snapshots_table)
 
 
 def delete_snapshot() -> None:
+    import inquirer
+
     snapshots = load_snapshots()
 
     if not snapshots:
@@ -687,9 +2111,12 @@ def delete_snapshot() -> None:
         console.print("Deletion cancelled.")
         return
 
-    for selected in answers["snapshots"]:
-        snapshot_name = selected.split(" (")[0]  # Extract the name from the selection
-        snapshots = [s for s in snapshots if s["name"] != snapshot_name]
+    # Extract the names from the selection
+    selected_names = {selected.split(" (")[0] for selected in answers["snapshots"]}
+    with snapshot_catalog() as catalog:
+        remove_snapshots(catalog, selected_names)
+
+    for snapshot_name in sorted(selected_names):
         snapshot_path = os.path.join(SNAPSHOTS_DIR, snapshot_name)
         if os.path.exists(snapshot_path):
             try:
@@ -706,11 +2133,12 @@ def delete_snapshot() -> None:
                 f"[yellow]Warning: Snapshot file '{snapshot_name}' not found on disk.[/yellow]"
             )
 
-    save_snapshots(snapshots)
     console.print("[green]Snapshot deletion process completed.[/green]")
 
 
-def restore_snapshot():
+def restore_snapshot(presets_only: bool = False):
+    import inquirer
+
     snapshots = load_snapshots()
 
     if not snapshots:
@@ -740,17 +2168,21 @@ def restore_snapshot():
 
     # Extract the snapshot name from the selection
     snapshot_name = answers["snapshot"].split(" (")[0]
-    snapshot_to_restore = next(
-        (s for s in snapshots if s["name"] == snapshot_name), None
-    )
+    with snapshot_catalog() as catalog:
+        snapshot_to_restore = get_snapshot(catalog, snapshot_name)
 
     if not snapshot_to_restore:
         console.print("[bold red]Error:[/bold red] Selected snapshot not found.")
         return
 
+    # Full snapshots carry the style_presets table too
+    scope = "presets" if presets_only else snapshot_scope(snapshot_to_restore)
+
     # Confirmation prompt
     confirm = inquirer.confirm(
-        "Are you sure you want to restore this snapshot? This will replace your current database."
+        "Are you sure you want to restore this snapshot? This will replace your current style presets."
+        if scope == "presets"
+        else "Are you sure you want to restore this snapshot? This will replace your current database."
     )
 
     if not confirm:
@@ -764,101 +2196,253 @@ def restore_snapshot():
         )
         return
 
-    # Backup current database
-    backup_path = DATABASE_PATH + ".backup"
     try:
-        shutil.copy2(DATABASE_PATH, backup_path)
-        console.print(f"[green]Current database backed up to {backup_path}[/green]")
+        with snapshot_database_file(snapshot_path) as restore_path:
+            if scope == "presets":
+                restore_presets_snapshot(restore_path, snapshot_name)
+            else:
+                restore_database_file(restore_path, snapshot_name)
     except Exception as e:
-        console.print(
-            f"[bold red]Error backing up current database:[/bold red] {str(e)}"
-        )
-        return
+        console.print(f"[bold red]Error reading snapshot:[/bold red] {str(e)}")
 
-    # Restore snapshot
+
+def restore_presets_snapshot(restore_path: str, snapshot_name: str) -> None:
+    # A single transaction on the live database, nothing to back up first
     try:
-        shutil.copy2(snapshot_path, DATABASE_PATH)
+        with db_connection(DATABASE_PATH) as db:
+            rows = restore_presets_table(db, restore_path)
         console.print(
-            f"[green]Snapshot '{snapshot_name}' successfully restored.[/green]"
+            f"[green]Snapshot '{snapshot_name}' successfully restored ({rows} presets).[/green]"
         )
     except Exception as e:
         console.print(f"[bold red]Error restoring snapshot:[/bold red] {str(e)}")
-        # If restoration fails, try to restore the backup
-        try:
-            shutil.copy2(backup_path, DATABASE_PATH)
-            console.print(
-                "[yellow]Restoration failed. Original database has been restored.[/yellow]"
-            )
-        except Exception as e2:
-            console.print(
-                f"[bold red]Error restoring original database:[/bold red] {str(e2)}"
-            )
-            console.print(
-                "[bold yellow]Please manually restore your database from the backup file.[/bold yellow]"
-            )
+        console.print("[yellow]All changes have been rolled back.[/yellow]")
+
+
+def restore_database_pages(
+    db: sqlite3.Connection,
+    restore_path: str,
+    pages: int = RESTORE_PAGE_STEP,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+) -> None:
+    # The online backup API holds the write lock on the live database until
+    # the last step, so readers never see a half restored file and a failure
+    # leaves the original pages in place
+    source = sqlite3.connect(restore_path)
+    try:
+        source.backup(db, pages=pages, progress=progress)
     finally:
-        # Clean up the backup file
-        if os.path.exists(backup_path):
-            os.remove(backup_path)
+        source.close()
 
 
-# ANCHOR: DATABASE FUNCTIONS END
+def restore_database_file(restore_path: str, snapshot_name: str) -> None:
+    with console.status("[green]Restoring snapshot...[/green]") as status:
 
+        def report(step: int, remaining: int, total: int) -> None:
+            status.update(
+                f"[green]Restoring snapshot... {total - remaining}/{total} pages[/green]"
+            )
 
-# ANCHOR: ABOUT FUNCTIONS START
+        try:
+            with db_connection(DATABASE_PATH) as db:
+                restore_database_pages(db, restore_path, progress=report)
+        except sqlite3.Error as e:
+            console.print(f"[bold red]Error restoring snapshot:[/bold red] {str(e)}")
+            console.print("[yellow]The current database was left unchanged.[/yellow]")
+            return
 
+    console.print(f"[green]Snapshot '{snapshot_name}' successfully restored.[/green]")
+
+
+PRESET_DIFF_QUERY = """
+    SELECT 'added', n.id, n.name, n.type, NULL, NULL, NULL, NULL
+    FROM new.style_presets AS n LEFT JOIN old.style_presets AS o ON o.id = n.id
+    WHERE o.id IS NULL
+    UNION ALL
+    SELECT 'removed', o.id, o.name, o.type, NULL, NULL, NULL, NULL
+    FROM old.style_presets AS o LEFT JOIN new.style_presets AS n ON n.id = o.id
+    WHERE n.id IS NULL
+    UNION ALL
+    SELECT 'modified', n.id, n.name, n.type, o.name, o.type, o.preset_data, n.preset_data
+    FROM old.style_presets AS o JOIN new.style_presets AS n ON n.id = o.id
+    WHERE o.name IS NOT n.name OR o.type IS NOT n.type
+        OR o.preset_data IS NOT n.preset_data
+"""
+
+
+def preset_changes(
+    old_name: str,
+    old_type: str,
+    new_name: str,
+    new_type: str,
+    old_data: str,
+    new_data: str,
+) -> List[str]:
+    changes = []
+    if old_name != new_name:
+        changes.append(f"name: {old_name} -> {new_name}")
+    if old_type != new_type:
+        changes.append(f"type: {old_type} -> {new_type}")
+    if old_data != new_data:
+        # Only the rows that actually differ are decoded
+        try:
+            old_preset, new_preset = json.loads(old_data), json.loads(new_data)
+        except json.JSONDecodeError:
+            changes.append("preset_data")
+        else:
+            changes.extend(
+                key
+                for key in sorted(set(old_preset) | set(new_preset))
+                if old_preset.get(key) != new_preset.get(key)
+            )
+    return changes
 
-def display_readme(requested_file: str) -> None:
 
-    readme_path = Path(requested_file)
+def diff_presets(old_path: str, new_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    db = sqlite3.connect(":memory:")
+    diff: Dict[str, List[Dict[str, Any]]] = {"added": [], "removed": [], "modified": []}
+    try:
+        db.execute("ATTACH DATABASE ? AS old", (old_path,))
+        db.execute("ATTACH DATABASE ? AS new", (new_path,))
+        for row in db.execute(PRESET_DIFF_QUERY):
+            change, preset_id, name, type, old_name, old_type, old_data, new_data = row
+            entry = {"id": preset_id, "name": name, "type": type}
+            if change == "modified":
+                entry["changes"] = preset_changes(
+                    old_name, old_type, name, type, old_data, new_data
+                )
+            diff[change].append(entry)
+    finally:
+        db.close()
+    for entries in diff.values():
+        entries.sort(key=lambda entry: (entry["type"], entry["name"], entry["id"]))
+    return diff
 
-    if readme_path.exists():
-        with readme_path.open("r", encoding="utf-8") as f:
-            markdown_content = f.read()
 
-        md = Markdown(markdown_content)
-        console.print(md)
-    else:
-        typer.echo(f"{requested_file} not found in the current directory.")
+def print_presets_diff(
+    diff: Dict[str, List[Dict[str, Any]]], old_label: str, new_label: str
+) -> None:
+    if not any(diff.values()):
+        console.print(
+            f"[green]No differences between '{old_label}' and '{new_label}'.[/green]"
+        )
+        return
+
+    diff_table = create_table(
+        f"Preset changes: {old_label} -> {new_label}",
+        [
+            ("Change", "white"),
+            ("Name", "white"),
+            ("Type", "yellow dim"),
+            ("Details", "white"),
+        ],
+    )
+    styles = {"added": "green", "removed": "red", "modified": "yellow"}
+    for change, entries in diff.items():
+        for entry in entries:
+            diff_table.add_row(
+                f"[{styles[change]}]{change}[/{styles[change]}]",
+                entry["name"],
+                entry["type"],
+                ", ".join(entry.get("changes", [])),
+            )
+    console.print(diff_table)
+    console.print(
+        f"[green]{len(diff['added'])} added[/green], "
+        f"[red]{len(diff['removed'])} removed[/red], "
+        f"[yellow]{len(diff['modified'])} modified[/yellow]"
+    )
+
 
+def find_snapshot(snapshot_name: str) -> Optional[Dict[str, Any]]:
+    with snapshot_catalog() as catalog:
+        snapshot = get_snapshot(catalog, snapshot_name)
+    if not snapshot or not os.path.exists(snapshot["path"]):
+        feedback_message(f"Snapshot '{snapshot_name}' not found.", "error")
+        return None
+    return snapshot
 
-def about_cli(readme: bool, changelog: bool) -> None:
-    documents: List[str] = []
-    if readme:
-        documents.append("README.md")
-    if changelog:
-        documents.append("CHANGELOG.md")
-    if not documents:
+
+def restore_presets_from_snapshot(
+    snapshot_name: str,
+    names: Optional[List[str]] = None,
+    preset_type: Optional[str] = None,
+    match: Optional[str] = None,
+    on_conflict: str = "skip",
+) -> None:
+    if on_conflict not in CONFLICT_POLICIES:
         feedback_message(
-            "No document specified. please --readme [-r] or --changelog [-c]", "warning"
+            f"Unknown conflict policy '{on_conflict}', use one of: {', '.join(CONFLICT_POLICIES)}",
+            "error",
         )
+        return
+    snapshot = find_snapshot(snapshot_name)
+    if not snapshot:
+        return
+
+    condition, params = preset_filter(names, preset_type, match, alias="s")
+    try:
+        with snapshot_database_file(snapshot["path"]) as restore_path:
+            with db_connection(DATABASE_PATH) as db:
+                matched, restored = restore_selected_presets(
+                    db, restore_path, condition, params, on_conflict
+                )
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"[bold red]Error restoring presets:[/bold red] {str(e)}")
+        console.print("[yellow]All changes have been rolled back.[/yellow]")
+        return
+
+    if not matched:
+        feedback_message("No presets in the snapshot match the selection.", "warning")
+        return
+    feedback_message(
+        f"Restored {restored} of {matched} matching presets from '{snapshot_name}'"
+        + (
+            f", skipped {matched - restored} that already exist."
+            if matched > restored
+            else "."
+        ),
+        "success",
+    )
+
+
+def diff_snapshots(
+    old_name: str, new_name: Optional[str] = None, as_json: bool = False
+) -> None:
+    names = [old_name] + ([new_name] if new_name else [])
+    snapshots = [find_snapshot(name) for name in names]
+    if not all(snapshots):
+        return
 
-    for document in documents:
+    # Identical catalog hashes mean identical presets, nothing to compare
+    if (
+        len(snapshots) == 2
+        and snapshots[0]["content_hash"]
+        and snapshots[0]["content_hash"] == snapshots[1]["content_hash"]
+    ):
+        diff: Dict[str, List[Dict[str, Any]]] = {
+            "added": [],
+            "removed": [],
+            "modified": [],
+        }
+    else:
         try:
-            # Try to get the file content from the package resources
-            with importlib.resources.open_text("invokeai_presets_cli", document) as f:
-                content = f.read()
-            # Create a temporary file to pass to display_readme
-            with tempfile.NamedTemporaryFile(
-                mode="w", delete=False, suffix=".md"
-            ) as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            display_readme(temp_file_path)
-            # Remove the temporary file
-            Path(temp_file_path).unlink()
-        except (FileNotFoundError, ImportError, ModuleNotFoundError):
-            # If not found in package resources, try the current directory
-            local_path = Path(document)
-            if local_path.exists():
-                display_readme(str(local_path))
-            else:
-                # Try one directory up
-                parent_path = local_path.parent.parent / document
-                if parent_path.exists():
-                    display_readme(str(parent_path))
-                else:
-                    feedback_message(f"{document} not found.", "warning")
+            with ExitStack() as stack:
+                paths = [
+                    stack.enter_context(snapshot_database_file(snapshot["path"]))
+                    for snapshot in snapshots
+                ]
+                if not new_name:
+                    paths.append(DATABASE_PATH)
+                diff = diff_presets(paths[0], paths[1])
+        except (OSError, sqlite3.Error) as e:
+            console.print(f"[bold red]Error comparing snapshots:[/bold red] {str(e)}")
+            return
+
+    if as_json:
+        typer.echo(json.dumps(diff, indent=2))
+    else:
+        print_presets_diff(diff, old_name, new_name or "live database")
 
 
-# ANCHOR: ABOUT FUNCTIONS END
+# ANCHOR: DATABASE FUNCTIONS END
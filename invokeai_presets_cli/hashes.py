@@ -0,0 +1,124 @@
+import json
+import sqlite3
+
+from typing import List, Dict, Optional, Tuple
+
+from .helpers import content_hash
+from .validation import PresetRecord
+
+__all__ = [
+    "init_hash_cache",
+    "sync_preset_hashes",
+    "load_preset_index",
+    "stored_preset_hashes",
+    "record_hash",
+]
+
+# InvokeAI ships default presets whose names users often reuse, so a stored
+# preset is found by its name and type together
+PresetIndex = Dict[Tuple[str, str], Tuple[str, str, str]]
+
+# SQLite's json_array renders the stored side exactly the way json.dumps with
+# these options renders an incoming record, so equal presets hash equally
+# however their preset_data happens to be formatted
+CANONICAL_PRESET_SQL = """
+    json_array(
+        s.type,
+        COALESCE(json_extract(s.preset_data, '$.positive_prompt'), ''),
+        COALESCE(json_extract(s.preset_data, '$.negative_prompt'), '')
+    )
+"""
+
+
+def record_hash(record: PresetRecord) -> str:
+    canonical = json.dumps(
+        [record.type, record.positive_prompt, record.negative_prompt],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return content_hash(canonical)
+
+
+def init_hash_cache(cache: sqlite3.Connection) -> None:
+    # Content hash of each stored preset, valid while updated_at is unchanged
+    with cache:
+        cache.execute(
+            """
+            CREATE TABLE IF NOT EXISTS preset_hashes (
+                id TEXT PRIMARY KEY,
+                updated_at TEXT,
+                hash TEXT
+            ) WITHOUT ROWID
+            """
+        )
+
+
+def sync_preset_hashes(
+    cache: sqlite3.Connection, database_path: str
+) -> Tuple[int, int]:
+    # Only presets written since the last sync are hashed again
+    cache.create_function("content_hash", 1, content_hash, deterministic=True)
+    cache.execute("ATTACH DATABASE ? AS live", (database_path,))
+    try:
+        with cache:
+            removed = cache.execute(
+                """
+                DELETE FROM preset_hashes WHERE NOT EXISTS (
+                    SELECT 1 FROM live.style_presets AS s WHERE s.id = preset_hashes.id
+                )
+                """
+            ).rowcount
+            hashed = cache.execute(
+                f"""
+                INSERT OR REPLACE INTO preset_hashes (id, updated_at, hash)
+                SELECT s.id, s.updated_at, content_hash({CANONICAL_PRESET_SQL})
+                FROM live.style_presets AS s
+                LEFT JOIN preset_hashes AS h ON h.id = s.id
+                WHERE h.updated_at IS NOT s.updated_at AND json_valid(s.preset_data)
+                """
+            ).rowcount
+    finally:
+        cache.execute("DETACH DATABASE live")
+    return hashed, removed
+
+
+def load_preset_index(
+    cache: sqlite3.Connection, database_path: str, preset_type: Optional[str] = None
+) -> PresetIndex:
+    # (name, type) -> (id, type, content hash) over every stored preset
+    type_clause = "WHERE s.type = :type" if preset_type else ""
+    cache.execute("ATTACH DATABASE ? AS live", (database_path,))
+    try:
+        cursor = cache.execute(
+            f"""
+            SELECT s.name, s.id, s.type, h.hash
+            FROM live.style_presets AS s
+            LEFT JOIN preset_hashes AS h ON h.id = s.id
+            {type_clause}
+            """,
+            {"type": preset_type},
+        )
+        return {
+            (name, type): (preset_id, type, digest or "")
+            for name, preset_id, type, digest in cursor
+        }
+    finally:
+        cache.execute("DETACH DATABASE live")
+
+
+def stored_preset_hashes(db: sqlite3.Connection, ids: List[str]) -> Dict[str, str]:
+    # Hashes straight from the live rows, for the few presets an import plan
+    # touches, without going through the sidecar
+    db.create_function("content_hash", 1, content_hash, deterministic=True)
+    cursor = db.execute(
+        f"""
+        SELECT
+            s.id,
+            CASE WHEN json_valid(s.preset_data)
+                THEN content_hash({CANONICAL_PRESET_SQL}) ELSE '' END
+        FROM style_presets AS s
+        WHERE s.id IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(ids),),
+    )
+    return dict(cursor)
@@ -1,23 +1,34 @@
 import os
 import typer
 import random
+import hashlib
 
-import tempfile
+import io
+import gzip
+import shutil
+import atexit
 import sqlite3
+import threading
 
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, IO
 from rich.console import Console
 from rich.table import Table
 
-
-from rich.traceback import install
-
-install()
-
-
 console = Console(soft_wrap=True)
 
-__all__ = ["feedback_message", "create_table", "add_rows_to_table", "random_name"]
+__all__ = [
+    "feedback_message",
+    "create_table",
+    "add_rows_to_table",
+    "random_name",
+    "content_hash",
+    "db_connection",
+    "compress_file",
+    "decompress_file",
+    "open_text_output",
+    "format_size",
+]
 
 
 def random_name(num_words: int = 2, separator: str = "_") -> str:
@@ -130,8 +141,144 @@ def add_rows_to_table(table: Table, data: Dict[str, Any]) -> None:
         table.add_row(key, str(value))
 
 
-def get_db(database_path: str, connection: bool) -> Any:
+def content_hash(text: str) -> str:
+    if text is None:
+        return ""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+try:
+    import zstandard
+except ImportError:  # optional, snapshots fall back to gzip
+    zstandard = None
+
+COPY_CHUNK_SIZE = 1024 * 1024
+COMPRESSION_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def default_compression() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def compression_for(path: str) -> str:
+    for method, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return method
+    return "none"
+
+
+def compress_file(source_path: str, dest_path: str, method: str) -> int:
+    # Streams in fixed size chunks so memory use does not grow with the file
+    with open(source_path, "rb") as source:
+        if method == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstd compression requires the zstandard package")
+            with open(dest_path, "wb") as dest:
+                zstandard.ZstdCompressor(level=10, threads=-1).copy_stream(
+                    source, dest, read_size=COPY_CHUNK_SIZE
+                )
+        elif method == "gzip":
+            with gzip.open(dest_path, "wb", compresslevel=6) as dest:
+                shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+        else:
+            with open(dest_path, "wb") as dest:
+                shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+    return os.path.getsize(dest_path)
+
+
+@contextmanager
+def open_text_output(path: str, method: str = "none") -> Iterator[IO[str]]:
+    # Text is compressed as it is written, nothing is buffered beyond the
+    # compressor's own window
+    if method == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the zstandard package")
+        with open(path, "wb") as raw:
+            writer = zstandard.ZstdCompressor(level=10).stream_writer(raw)
+            with io.TextIOWrapper(writer, encoding="utf-8") as f:
+                yield f
+    elif method == "gzip":
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            yield f
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            yield f
+
+
+def decompress_file(source_path: str, dest_path: str) -> None:
+    method = compression_for(source_path)
+    with open(dest_path, "wb") as dest:
+        if method == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstd snapshots require the zstandard package")
+            with open(source_path, "rb") as source:
+                zstandard.ZstdDecompressor().copy_stream(
+                    source, dest, read_size=COPY_CHUNK_SIZE
+                )
+        elif method == "gzip":
+            with gzip.open(source_path, "rb") as source:
+                shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+        else:
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+
+
+def format_size(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# Applied to every connection opened through db_connection. The journal mode
+# is left as InvokeAI configured it, a WAL database only gets the cheaper sync.
+DB_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -16000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+_connections = threading.local()
+
+
+def open_connection(database_path: str) -> sqlite3.Connection:
     database = sqlite3.connect(database_path)
-    if connection:
-        return database
-    return database.cursor()
+    for pragma, value in DB_PRAGMAS.items():
+        database.execute(f"PRAGMA {pragma} = {value}")
+    journal_mode = database.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode.lower() == "wal":
+        database.execute("PRAGMA synchronous = NORMAL")
+    return database
+
+
+def shared_connection(database_path: str) -> sqlite3.Connection:
+    # SQLite connections are bound to the thread that opened them, so the
+    # connections are reused per (thread, database path)
+    if not hasattr(_connections, "open"):
+        _connections.open = {}
+    database = _connections.open.get(database_path)
+    if database is None:
+        database = open_connection(database_path)
+        _connections.open[database_path] = database
+    return database
+
+
+def close_connections() -> None:
+    for database in getattr(_connections, "open", {}).values():
+        database.close()
+    _connections.open = {}
+
+
+atexit.register(close_connections)
+
+
+@contextmanager
+def db_connection(database_path: str) -> Iterator[sqlite3.Connection]:
+    database = shared_connection(database_path)
+    try:
+        yield database
+    except BaseException:
+        if database.in_transaction:
+            database.rollback()
+        raise
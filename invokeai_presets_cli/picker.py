@@ -0,0 +1,135 @@
+import math
+
+from typing import List, Tuple, Set, Any, Optional, Protocol
+
+from .helpers import feedback_message
+
+__all__ = ["ChoiceSource", "ListChoices", "pick"]
+
+PICKER_PAGE_SIZE = 15
+
+Choice = Tuple[str, Any]
+
+
+class ChoiceSource(Protocol):
+    def count(self, text: str) -> int: ...
+
+    def page(self, text: str, number: int, size: int) -> List[Choice]: ...
+
+    def keys(self, text: str) -> Set[Any]: ...
+
+
+class ListChoices:
+    # In-memory choices keyed by their position, used for presets read from a
+    # file or URL. Prefix matches rank before substring and fuzzy matches, and
+    # a longer search only re-checks the matches of the shorter one.
+
+    def __init__(self, labels: List[str]) -> None:
+        self.labels = labels
+        self.folded = [label.casefold() for label in labels]
+        self.last: Tuple[str, List[int]] = ("", list(range(len(labels))))
+
+    def matches(self, text: str) -> List[int]:
+        needle = text.casefold()
+        if not needle:
+            return list(range(len(self.labels)))
+        previous, candidates = self.last
+        if not previous or not needle.startswith(previous):
+            candidates = range(len(self.labels))
+
+        prefix, substring, fuzzy = [], [], []
+        for position in candidates:
+            label = self.folded[position]
+            if label.startswith(needle):
+                prefix.append(position)
+            elif needle in label:
+                substring.append(position)
+            elif is_subsequence(needle, label):
+                fuzzy.append(position)
+        # Rank order is kept for display, candidates are refined in label order
+        self.last = (needle, sorted(prefix + substring + fuzzy))
+        return prefix + substring + fuzzy
+
+    def count(self, text: str) -> int:
+        return len(self.matches(text))
+
+    def page(self, text: str, number: int, size: int) -> List[Choice]:
+        positions = self.matches(text)[number * size : (number + 1) * size]
+        return [(self.labels[position], position) for position in positions]
+
+    def keys(self, text: str) -> Set[Any]:
+        return set(self.matches(text))
+
+
+def is_subsequence(needle: str, label: str) -> bool:
+    characters = iter(label)
+    return all(character in characters for character in needle)
+
+
+def pick(
+    source: ChoiceSource, message: str, page_size: int = PICKER_PAGE_SIZE
+) -> Optional[Set[Any]]:
+    # Only one page of choices is handed to inquirer at a time, the selection
+    # lives in a set so checking and unchecking never scans a list
+    import inquirer
+
+    selected: Set[Any] = set()
+    text = ""
+    number = 0
+
+    while True:
+        total = source.count(text)
+        pages = max(math.ceil(total / page_size), 1)
+        number = min(number, pages - 1)
+        choices = source.page(text, number, page_size)
+        search_note = f", search: '{text}'" if text else ""
+
+        if choices:
+            answers = inquirer.prompt(
+                [
+                    inquirer.Checkbox(
+                        "page",
+                        message=f"{message} (page {number + 1}/{pages}, {len(selected)} selected{search_note})",
+                        choices=choices,
+                        default=[key for _, key in choices if key in selected],
+                    )
+                ]
+            )
+            if answers is None:
+                return None
+            selected -= {key for _, key in choices}
+            selected |= set(answers["page"])
+        else:
+            feedback_message(f"No presets match '{text}'.", "warning")
+
+        actions = []
+        if number + 1 < pages:
+            actions.append("Next page")
+        if number > 0:
+            actions.append("Previous page")
+        actions.append("Search")
+        if total:
+            actions.append(f"Select all {total} shown")
+        if selected:
+            actions.append("Clear selection")
+        actions += [f"Done ({len(selected)} selected)", "Cancel"]
+
+        action = inquirer.list_input("What next?", choices=actions)
+        if action == "Next page":
+            number += 1
+        elif action == "Previous page":
+            number -= 1
+        elif action == "Search":
+            text = (
+                inquirer.text(message="Search (leave empty to show all)", default=text)
+                or ""
+            ).strip()
+            number = 0
+        elif action and action.startswith("Select all"):
+            selected |= source.keys(text)
+        elif action == "Clear selection":
+            selected.clear()
+        elif action and action.startswith("Done"):
+            return selected
+        else:
+            return None
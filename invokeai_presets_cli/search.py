@@ -0,0 +1,227 @@
+import os
+import re
+import sqlite3
+
+from typing import List, Dict, Any, Optional, Tuple
+
+__all__ = [
+    "init_search_index",
+    "sync_search_index",
+    "search_index",
+    "match_presets",
+    "fts_query",
+]
+
+# bm25 column weights for name, positive_prompt and negative_prompt
+RANK_WEIGHTS = (10.0, 2.0, 1.0)
+SNIPPET_TOKENS = 12
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+LIVE_INDEX = "idx_style_presets_id_updated_at"
+
+
+def init_search_index(index: sqlite3.Connection) -> None:
+    # search_presets maps each preset id to the FTS rowid and remembers the
+    # updated_at it was indexed at, that pair is all a sync has to compare
+    with index:
+        index.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_presets (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                type TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        index.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_presets_id_updated_at "
+            "ON search_presets(id, updated_at)"
+        )
+        index.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS preset_fts USING fts5(
+                name,
+                positive_prompt,
+                negative_prompt,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """
+        )
+        index.execute(
+            "CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+
+def database_fingerprint(database_path: str) -> str:
+    # Commits bump the change counter in the file header, or grow the WAL
+    parts = [os.path.abspath(database_path)]
+    with open(database_path, "rb") as f:
+        parts.append(str(int.from_bytes(f.read(100)[24:28], "big")))
+    for path in (database_path, database_path + "-wal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts += [str(stat.st_mtime_ns), str(stat.st_size)]
+    return ":".join(parts)
+
+
+def sync_search_index(
+    index: sqlite3.Connection, database_path: str, force: bool = False
+) -> Tuple[int, int]:
+    fingerprint = database_fingerprint(database_path)
+    row = index.execute(
+        "SELECT value FROM search_meta WHERE key = 'fingerprint'"
+    ).fetchone()
+    if row and row[0] == fingerprint and not force:
+        return 0, 0
+
+    index.execute("ATTACH DATABASE ? AS live", (database_path,))
+    try:
+        with index:
+            index.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS stale_presets (id TEXT PRIMARY KEY)"
+            )
+            index.execute("DELETE FROM temp.stale_presets")
+            # Deleted presets and presets whose updated_at moved since indexing,
+            # read from the (id, updated_at) index alone when the database has it
+            covering = index.execute(
+                "SELECT 1 FROM live.sqlite_master WHERE type = 'index' AND name = ?",
+                (LIVE_INDEX,),
+            ).fetchone()
+            indexed_by = f"INDEXED BY {LIVE_INDEX}" if covering else ""
+            stale = index.execute(
+                f"""
+                INSERT INTO temp.stale_presets
+                SELECT p.id FROM search_presets AS p
+                LEFT JOIN live.style_presets AS s {indexed_by} ON s.id = p.id
+                WHERE s.updated_at IS NOT p.updated_at
+                """
+            ).rowcount
+            index.execute(
+                """
+                DELETE FROM preset_fts WHERE rowid IN (
+                    SELECT rowid FROM search_presets
+                    WHERE id IN (SELECT id FROM temp.stale_presets)
+                )
+                """
+            )
+            index.execute(
+                "DELETE FROM search_presets WHERE id IN (SELECT id FROM temp.stale_presets)"
+            )
+
+            last_rowid = index.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM search_presets"
+            ).fetchone()[0]
+            # Changed presets go back in straight from the stale list, the
+            # anti-join over the whole table only runs when presets were added
+            changed = index.execute(
+                """
+                INSERT INTO search_presets (id, type, updated_at)
+                SELECT s.id, s.type, s.updated_at FROM temp.stale_presets AS t
+                JOIN live.style_presets AS s ON s.id = t.id
+                """
+            ).rowcount
+            live_count = index.execute(
+                "SELECT COUNT(*) FROM live.style_presets"
+            ).fetchone()[0]
+            indexed_count = index.execute(
+                "SELECT COUNT(*) FROM search_presets"
+            ).fetchone()[0]
+            added = changed
+            if indexed_count != live_count:
+                added += index.execute(
+                    """
+                    INSERT INTO search_presets (id, type, updated_at)
+                    SELECT s.id, s.type, s.updated_at FROM live.style_presets AS s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM search_presets AS p WHERE p.id = s.id
+                    )
+                    """
+                ).rowcount
+            # Prompts are pulled out of preset_data by SQLite, only for new rows
+            index.execute(
+                """
+                INSERT INTO preset_fts (rowid, name, positive_prompt, negative_prompt)
+                SELECT
+                    p.rowid,
+                    s.name,
+                    json_extract(s.preset_data, '$.positive_prompt'),
+                    json_extract(s.preset_data, '$.negative_prompt')
+                FROM search_presets AS p
+                JOIN live.style_presets AS s ON s.id = p.id
+                WHERE p.rowid > ? AND json_valid(s.preset_data)
+                """,
+                (last_rowid,),
+            )
+            index.execute(
+                "INSERT OR REPLACE INTO search_meta VALUES ('fingerprint', ?)",
+                (fingerprint,),
+            )
+    finally:
+        index.execute("DETACH DATABASE live")
+    return added, stale - changed
+
+
+def fts_query(text: str) -> str:
+    # Every word has to match, as a prefix, so "cine noir" finds "cinematic noir"
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_index(
+    index: sqlite3.Connection,
+    text: str,
+    preset_type: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    query = fts_query(text)
+    if not query:
+        return []
+    type_clause = "AND p.type = :type" if preset_type else ""
+    cursor = index.execute(
+        f"""
+        SELECT
+            p.id,
+            preset_fts.name,
+            p.type,
+            snippet(preset_fts, -1, :start, :end, '…', {SNIPPET_TOKENS}),
+            bm25(preset_fts, {', '.join(map(str, RANK_WEIGHTS))}) AS rank
+        FROM preset_fts
+        JOIN search_presets AS p ON p.rowid = preset_fts.rowid
+        WHERE preset_fts MATCH :query {type_clause}
+        ORDER BY rank
+        LIMIT :limit
+        """,
+        {
+            "query": query,
+            "type": preset_type,
+            "limit": limit,
+            "start": HIGHLIGHT_START,
+            "end": HIGHLIGHT_END,
+        },
+    )
+    return [
+        {"id": preset_id, "name": name, "type": type, "snippet": snippet, "rank": rank}
+        for preset_id, name, type, snippet, rank in cursor
+    ]
+
+
+def match_presets(
+    index: sqlite3.Connection, text: str, preset_type: Optional[str] = None
+) -> List[Tuple[str, str, str]]:
+    # Every match as (id, name, type) in rank order, for the interactive picker
+    query = fts_query(text)
+    if not query:
+        return []
+    type_clause = "AND p.type = :type" if preset_type else ""
+    return index.execute(
+        f"""
+        SELECT p.id, preset_fts.name, p.type
+        FROM preset_fts
+        JOIN search_presets AS p ON p.rowid = preset_fts.rowid
+        WHERE preset_fts MATCH :query {type_clause}
+        ORDER BY bm25(preset_fts, {', '.join(map(str, RANK_WEIGHTS))})
+        """,
+        {"query": query, "type": preset_type},
+    ).fetchall()
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import httpx
+
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Callable, Optional
+
+__all__ = ["read_manifest", "fetch_sources", "ResponseCache"]
+
+
+FETCH_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5
+MAX_CONNECTIONS = 16
+PER_HOST_CONNECTIONS = 4
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+class ResponseCache:
+    # URL -> last body with its validators, plus the parsed result of that body
+    # tagged with the parser that produced it. A 304 with a matching parse key
+    # reuses the parsed result as-is.
+
+    def __init__(
+        self,
+        cache_path: str,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_age: float = CACHE_MAX_AGE,
+    ) -> None:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.db = sqlite3.connect(cache_path)
+        with self.db:
+            self.db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body TEXT NOT NULL,
+                    parse_key TEXT,
+                    parsed TEXT,
+                    size INTEGER NOT NULL,
+                    validated_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)"
+            )
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT etag, last_modified, body, parse_key, parsed FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("etag", "last_modified", "body", "parse_key", "parsed"), row))
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(
+        self,
+        url: str,
+        response: httpx.Response,
+        parse_key: Optional[str] = None,
+        parsed: Any = None,
+    ) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Nothing to revalidate against, storing the body would never pay off
+            return
+        body = response.text
+        parsed_text = json.dumps(parsed) if parsed is not None else None
+        size = len(body) + len(parsed_text or "")
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    etag,
+                    last_modified,
+                    body,
+                    parse_key,
+                    parsed_text,
+                    size,
+                    now,
+                    now,
+                ),
+            )
+
+    def store_parsed(self, url: str, parse_key: str, parsed: Any) -> None:
+        parsed_text = json.dumps(parsed)
+        with self.db:
+            self.db.execute(
+                "UPDATE responses SET parse_key = ?, parsed = ?, size = length(body) + ? WHERE url = ?",
+                (parse_key, parsed_text, len(parsed_text), url),
+            )
+
+    def touch(self, url: str) -> None:
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "UPDATE responses SET validated_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def evict(self) -> int:
+        with self.db:
+            expired = self.db.execute(
+                "DELETE FROM responses WHERE validated_at < ?",
+                (time.time() - self.max_age,),
+            ).rowcount
+            # Keep the most recently used entries that fit in max_bytes
+            oversized = self.db.execute(
+                """
+                DELETE FROM responses WHERE url IN (
+                    SELECT url FROM (
+                        SELECT url, SUM(size) OVER (ORDER BY accessed_at DESC) AS total
+                        FROM responses
+                    ) WHERE total > ?
+                )
+                """,
+                (self.max_bytes,),
+            ).rowcount
+        return expired + oversized
+
+    def close(self) -> None:
+        self.evict()
+        self.db.close()
+
+
+def read_manifest(manifest_path: str) -> List[str]:
+    # Either a JSON list of URLs or a plain text file with one URL per line
+    content = Path(manifest_path).expanduser().read_text(encoding="utf-8")
+    if manifest_path.endswith(".json"):
+        urls = json.loads(content)
+        if not isinstance(urls, list):
+            raise ValueError("Invalid manifest format. Expected a list of URLs.")
+        return [str(url).strip() for url in urls if str(url).strip()]
+    return [
+        line.strip()
+        for line in content.splitlines()
+        if line.strip() and not line.strip().startswith("#")
+    ]
+
+
+async def fetch_source(
+    client: httpx.AsyncClient,
+    host_limits: Dict[str, asyncio.Semaphore],
+    url: str,
+    parse: Callable[[str], Any],
+    cache: Optional[ResponseCache] = None,
+    parse_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"url": url, "data": None, "error": None, "cached": False}
+    start = time.perf_counter()
+    cached = cache.get(url) if cache else None
+    headers = cache.conditional_headers(cached) if cache else {}
+
+    try:
+        host_limit = host_limits[urlparse(url).netloc]
+    except ValueError as e:
+        result["error"] = f"Invalid URL: {str(e)}"
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    async with host_limit:
+        for attempt in range(FETCH_RETRIES + 1):
+            try:
+                response = await client.get(url, headers=headers)
+                if (
+                    response.status_code in RETRY_STATUS_CODES
+                    and attempt < FETCH_RETRIES
+                ):
+                    await asyncio.sleep(FETCH_BACKOFF * 2**attempt)
+                    continue
+                if response.status_code != 304:
+                    response.raise_for_status()
+                break
+            except (httpx.InvalidURL, httpx.UnsupportedProtocol, ValueError) as e:
+                # Retrying cannot fix the URL itself
+                result["error"] = f"Invalid URL: {str(e)}"
+                result["elapsed"] = time.perf_counter() - start
+                return result
+            except httpx.TransportError as e:
+                if attempt == FETCH_RETRIES:
+                    result["error"] = f"Error fetching from URL: {str(e)}"
+                    result["elapsed"] = time.perf_counter() - start
+                    return result
+                await asyncio.sleep(FETCH_BACKOFF * 2**attempt)
+            except httpx.HTTPStatusError as e:
+                result["error"] = f"Error fetching from URL: {str(e)}"
+                result["elapsed"] = time.perf_counter() - start
+                return result
+
+    if response.status_code == 304 and cached:
+        cache.touch(url)
+        result["cached"] = True
+        if parse_key and cached["parse_key"] == parse_key and cached["parsed"]:
+            result["data"] = json.loads(cached["parsed"])
+            result["elapsed"] = time.perf_counter() - start
+            return result
+        content = cached["body"]
+    else:
+        content = response.text
+
+    # Parse off the event loop so the remaining downloads keep flowing
+    try:
+        result["data"] = await asyncio.to_thread(parse, content)
+    except ValueError as e:
+        result["error"] = str(e)
+    else:
+        if cache and parse_key and result["cached"]:
+            cache.store_parsed(url, parse_key, result["data"])
+        elif cache and not result["cached"]:
+            cache.put(url, response, parse_key, result["data"] if parse_key else None)
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+async def fetch_sources_async(
+    urls: List[str],
+    parse: Callable[[str], Any],
+    cache: Optional[ResponseCache] = None,
+    parse_key: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS
+    )
+    # fetch_source is the only retry layer, for transport errors and bad
+    # statuses alike, with backoff between attempts
+    transport = httpx.AsyncHTTPTransport(limits=limits)
+    host_limits: Dict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(PER_HOST_CONNECTIONS)
+    )
+    async with httpx.AsyncClient(
+        transport=transport, timeout=FETCH_TIMEOUT, follow_redirects=True
+    ) as client:
+        return await asyncio.gather(
+            *(
+                fetch_source(client, host_limits, url, parse, cache, parse_key)
+                for url in urls
+            )
+        )
+
+
+def fetch_sources(
+    urls: List[str],
+    parse: Callable[[str], Any],
+    cache: Optional[ResponseCache] = None,
+    parse_key: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    return asyncio.run(fetch_sources_async(urls, parse, cache, parse_key))
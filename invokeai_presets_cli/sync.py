@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from .validation import PresetRecord, PresetError, validate_presets
+
+__all__ = ["init_scan_cache", "scan_directory", "parse_preset_file"]
+
+# Bumped whenever parsing or validation changes, cached results are dropped
+SCAN_VERSION = "1"
+
+ScannedFile = Tuple[str, List[PresetRecord], List[PresetError]]
+
+
+def init_scan_cache(cache: sqlite3.Connection) -> None:
+    # One row per preset file: what it looked like when it was last parsed
+    # and the records and problems that came out of it
+    with cache:
+        cache.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scanned_files (
+                root TEXT NOT NULL,
+                path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                records TEXT NOT NULL,
+                errors TEXT NOT NULL,
+                PRIMARY KEY (root, path)
+            ) WITHOUT ROWID
+            """
+        )
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS scan_meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        row = cache.execute(
+            "SELECT value FROM scan_meta WHERE key = 'version'"
+        ).fetchone()
+        if not row or row[0] != SCAN_VERSION:
+            cache.execute("DELETE FROM scanned_files")
+            cache.execute(
+                "INSERT OR REPLACE INTO scan_meta VALUES ('version', ?)",
+                (SCAN_VERSION,),
+            )
+
+
+def preset_files(root: str) -> Dict[str, os.stat_result]:
+    # Relative path -> stat of every .json file, hidden directories like .git
+    # are skipped
+    files = {}
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(".json") and entry.is_file():
+                    files[os.path.relpath(entry.path, root)] = entry.stat()
+    return files
+
+
+def parse_preset_file(
+    content: bytes, source: str
+) -> Tuple[List[PresetRecord], List[PresetError]]:
+    # A file holds a list of presets or a single preset object
+    try:
+        presets = json.loads(content)
+    except ValueError as e:
+        return [], [PresetError("$", f"invalid JSON: {str(e)}", "", source)]
+    if isinstance(presets, dict):
+        return validate_presets([presets], source=source)
+    if not isinstance(presets, list):
+        return [], [
+            PresetError(
+                "$", "expected a list of presets or a preset object", "", source
+            )
+        ]
+    return validate_presets(presets, source=source)
+
+
+def scan_directory(
+    cache: sqlite3.Connection, root: str, paths: Optional[Iterable[str]] = None
+) -> Tuple[List[ScannedFile], Dict[str, int]]:
+    # Files whose mtime and size match the cache are not opened at all, files
+    # that were only touched are hashed but not parsed again. With `paths`
+    # only those files are looked at, the rest of the tree comes from the cache
+    root = os.path.abspath(root)
+    cached = {
+        path: (mtime_ns, size, digest, records, errors)
+        for path, mtime_ns, size, digest, records, errors in cache.execute(
+            "SELECT path, mtime_ns, size, hash, records, errors FROM scanned_files "
+            "WHERE root = ?",
+            (root,),
+        )
+    }
+    files: Dict[str, Optional[os.stat_result]]
+    if paths is None:
+        files = dict(preset_files(root))
+    else:
+        # None stands for "unchanged since the last scan"
+        files = dict.fromkeys(cached)
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(root, path))
+            except FileNotFoundError:
+                files.pop(path, None)
+                continue
+            files[path] = stat
+    stats = {"files": len(files), "hashed": 0, "parsed": 0, "removed": 0}
+    changed = []
+    scanned: List[ScannedFile] = []
+
+    for path in sorted(files):
+        stat = files[path]
+        entry = cached.get(path)
+        if entry and (
+            stat is None or (entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size)
+        ):
+            records_json, errors_json = entry[3], entry[4]
+        else:
+            with open(os.path.join(root, path), "rb") as f:
+                content = f.read()
+            digest = hashlib.sha1(content).hexdigest()
+            stats["hashed"] += 1
+            if entry and entry[2] == digest:
+                records_json, errors_json = entry[3], entry[4]
+            else:
+                records, errors = parse_preset_file(content, path)
+                records_json = json.dumps(records, ensure_ascii=False)
+                errors_json = json.dumps(errors, ensure_ascii=False)
+                stats["parsed"] += 1
+            changed.append(
+                (
+                    root,
+                    path,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    digest,
+                    records_json,
+                    errors_json,
+                )
+            )
+        scanned.append(
+            (
+                path,
+                [PresetRecord(*record) for record in json.loads(records_json)],
+                [PresetError(*error) for error in json.loads(errors_json)],
+            )
+        )
+
+    removed = [(root, path) for path in cached if path not in files]
+    stats["removed"] = len(removed)
+    with cache:
+        cache.executemany(
+            "INSERT OR REPLACE INTO scanned_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            changed,
+        )
+        cache.executemany(
+            "DELETE FROM scanned_files WHERE root = ? AND path = ?", removed
+        )
+    return scanned, stats
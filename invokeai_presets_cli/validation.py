@@ -0,0 +1,152 @@
+from typing import List, Dict, Any, NamedTuple, Tuple
+
+__all__ = [
+    "PresetRecord",
+    "PresetError",
+    "validate_positions",
+    "validate_presets",
+    "merge_sources",
+]
+
+PRESET_TYPES = ("user", "project", "default")
+
+
+class PresetRecord(NamedTuple):
+    # A preset normalised from either the preset_data or the flat layout
+    name: str
+    type: str
+    positive_prompt: str
+    negative_prompt: str
+
+    def as_preset(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "preset_data": {
+                "positive_prompt": self.positive_prompt,
+                "negative_prompt": self.negative_prompt,
+            },
+        }
+
+
+class PresetError(NamedTuple):
+    path: str
+    message: str
+    name: str = ""
+    source: str = ""
+
+
+def read_prompt(
+    container: Dict[str, Any], path: str, key: str, errors: List[PresetError], name: str
+) -> str:
+    # "prompt" is the old spelling of positive_prompt, missing prompts are empty
+    value = container.get(key)
+    if value is None and key == "positive_prompt":
+        key = "prompt"
+        value = container.get(key)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        errors.append(PresetError(f"{path}.{key}", "expected a string", name))
+        return ""
+    return value
+
+
+def duplicate_error(
+    name: str, position: int, source: str, seen: Dict[str, Tuple[str, int]]
+) -> PresetError:
+    first_source, first_position = seen[name]
+    first = f"$[{first_position}]"
+    if first_source != source:
+        first = f"{first_source} {first}"
+    return PresetError(f"$[{position}].name", f"duplicate of {first}", name, source)
+
+
+def validate_positions(
+    presets: List[Any], project_type: bool = False, source: str = ""
+) -> Tuple[List[Tuple[int, PresetRecord]], List[PresetError]]:
+    # One pass over a parsed source; the input is never modified. Invalid
+    # presets and repeated names are reported with the JSON path of the problem,
+    # valid records keep their position for merge_sources
+    records: List[Tuple[int, PresetRecord]] = []
+    errors: List[PresetError] = []
+    seen: Dict[str, Tuple[str, int]] = {}
+
+    for position, preset in enumerate(presets):
+        path = f"$[{position}]"
+        if not isinstance(preset, dict):
+            errors.append(PresetError(path, "expected an object"))
+            continue
+
+        name = preset.get("name")
+        if not isinstance(name, str) or not name.strip():
+            errors.append(PresetError(f"{path}.name", "expected a non-empty string"))
+            continue
+
+        count = len(errors)
+        if "preset_data" in preset:
+            container = preset["preset_data"]
+            container_path = f"{path}.preset_data"
+            if not isinstance(container, dict):
+                errors.append(PresetError(container_path, "expected an object", name))
+                continue
+            preset_type = preset.get("type", "user")
+        elif "positive_prompt" in preset or "prompt" in preset:
+            container, container_path = preset, path
+            preset_type = "project" if project_type else preset.get("type", "user")
+        else:
+            errors.append(
+                PresetError(path, "missing preset_data or positive_prompt", name)
+            )
+            continue
+
+        positive = read_prompt(
+            container, container_path, "positive_prompt", errors, name
+        )
+        negative = read_prompt(
+            container, container_path, "negative_prompt", errors, name
+        )
+        if preset_type not in PRESET_TYPES:
+            errors.append(
+                PresetError(
+                    f"{path}.type", f"expected one of {', '.join(PRESET_TYPES)}", name
+                )
+            )
+        if len(errors) > count:
+            continue
+
+        if name in seen:
+            errors.append(duplicate_error(name, position, "", seen))
+            continue
+        seen[name] = ("", position)
+        records.append((position, PresetRecord(name, preset_type, positive, negative)))
+
+    if source:
+        errors = [error._replace(source=source) for error in errors]
+    return records, errors
+
+
+def validate_presets(
+    presets: List[Any], project_type: bool = False, source: str = ""
+) -> Tuple[List[PresetRecord], List[PresetError]]:
+    records, errors = validate_positions(presets, project_type, source)
+    return [record for _, record in records], errors
+
+
+def merge_sources(
+    sources: List[Tuple[str, List[Tuple[int, PresetRecord]], List[PresetError]]],
+) -> Tuple[List[PresetRecord], List[PresetError]]:
+    # Sources are validated one by one (and cached that way), a name that an
+    # earlier source already defined is rejected here
+    records: List[PresetRecord] = []
+    errors: List[PresetError] = []
+    seen: Dict[str, Tuple[str, int]] = {}
+    for source, positioned, source_errors in sources:
+        errors.extend(source_errors)
+        for position, record in positioned:
+            if record.name in seen:
+                errors.append(duplicate_error(record.name, position, source, seen))
+                continue
+            seen[record.name] = (source, position)
+            records.append(record)
+    return records, errors
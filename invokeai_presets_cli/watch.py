@@ -0,0 +1,198 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from typing import Dict, Optional, Set, Tuple, Union
+
+from .sync import preset_files
+
+__all__ = ["open_watcher", "collect_changes", "InotifyWatcher", "PollingWatcher"]
+
+# inotify flags from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+POLL_INTERVAL = 0.5
+DEBOUNCE = 0.15
+MAX_DELAY = 0.5
+
+# A watcher returns the relative paths of preset files that changed, an empty
+# set when nothing did, or None when it lost track and a full rescan is needed
+Changes = Optional[Set[str]]
+
+
+def is_preset_path(path: str) -> bool:
+    parts = path.split(os.sep)
+    return path.lower().endswith(".json") and not any(
+        part.startswith(".") for part in parts
+    )
+
+
+class InotifyWatcher:
+    # Linux only, through libc so no extra dependency is needed. Every
+    # directory of the tree gets its own watch, new directories are added as
+    # they appear
+
+    def __init__(self, root: str) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.root = os.path.abspath(root)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: Dict[int, str] = {}
+        try:
+            self.watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+
+    def watch_tree(self, directory: str) -> Set[str]:
+        # Watches a directory and everything below it, returning the preset
+        # files already inside (a directory moved into the tree arrives whole)
+        found = set()
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {current}")
+            self.directories[wd] = current
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        path = os.path.relpath(entry.path, self.root)
+                        if is_preset_path(path):
+                            found.add(path)
+        return found
+
+    def wait(self, timeout: float) -> Changes:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changes: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            full_path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if name.startswith("."):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changes |= self.watch_tree(full_path)
+                    except OSError:
+                        return None
+                else:
+                    # The files of a removed directory are not listed one by one
+                    return None
+                continue
+            path = os.path.relpath(full_path, self.root)
+            if is_preset_path(path) and not mask & IN_CREATE:
+                # A created file is picked up on IN_CLOSE_WRITE, once complete
+                changes.add(path)
+        return changes
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Fallback for platforms without inotify: compares mtime and size of
+    # every preset file on each poll
+
+    def __init__(self, root: str, interval: float = POLL_INTERVAL) -> None:
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self.known = self.snapshot()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        return {
+            path: (stat.st_mtime_ns, stat.st_size)
+            for path, stat in preset_files(self.root).items()
+        }
+
+    def wait(self, timeout: float) -> Changes:
+        time.sleep(min(timeout, self.interval))
+        current = self.snapshot()
+        changes = {
+            path
+            for path in self.known.keys() | current.keys()
+            if self.known.get(path) != current.get(path)
+        }
+        self.known = current
+        return changes
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    root: str, poll: bool = False
+) -> Union[InotifyWatcher, PollingWatcher]:
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def collect_changes(
+    watcher: Union[InotifyWatcher, PollingWatcher],
+    timeout: float = 1.0,
+    debounce: float = DEBOUNCE,
+    max_delay: float = MAX_DELAY,
+) -> Changes:
+    # Waits up to `timeout` for a first change, then keeps collecting until the
+    # tree has been quiet for `debounce` seconds or `max_delay` has passed, so
+    # an editor saving in several steps becomes one batch
+    changes = watcher.wait(timeout)
+    if changes is None:
+        return None
+    if not changes:
+        return set()
+    deadline = time.monotonic() + max_delay
+    while time.monotonic() < deadline:
+        more = watcher.wait(min(debounce, max(deadline - time.monotonic(), 0)))
+        if more is None:
+            return None
+        if not more:
+            break
+        changes |= more
+    return changes
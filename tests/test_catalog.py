@@ -0,0 +1,55 @@
+import json
+import sqlite3
+
+from datetime import datetime, timedelta
+
+from invokeai_presets_cli.catalog import (
+    add_snapshot,
+    get_snapshot,
+    get_snapshots,
+    init_catalog,
+    prune_snapshots,
+)
+
+
+def snapshot(name, timestamp):
+    return {
+        "name": name,
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        "path": f"/snapshots/{name}",
+    }
+
+
+def test_prune_snapshots_keeps_gfs_buckets():
+    catalog = sqlite3.connect(":memory:")
+    init_catalog(catalog)
+    now = datetime(2024, 10, 16, 12, 0)
+    # Four snapshots an hour apart today, one a day for the previous ten days
+    for hour in range(4):
+        add_snapshot(catalog, snapshot(f"h{hour}", now - timedelta(hours=hour)))
+    for day in range(1, 11):
+        add_snapshot(catalog, snapshot(f"d{day}", now - timedelta(days=day)))
+
+    expired = prune_snapshots(catalog, keep_last=1, hourly=2, daily=3, weekly=0)
+    kept = [s["name"] for s in get_snapshots(catalog)]
+
+    assert kept == ["d2", "d1", "h1", "h0"]
+    assert {s["name"] for s in expired} == {"h2", "h3"} | {
+        f"d{day}" for day in range(3, 11)
+    }
+    assert prune_snapshots(catalog, keep_last=1, hourly=2, daily=3) == []
+
+
+def test_init_catalog_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / "snapshots.json"
+    legacy.write_text(
+        json.dumps(
+            [{"name": "old.db", "timestamp": "2024-09-16 12:00:00", "path": "x"}]
+        )
+    )
+    catalog = sqlite3.connect(":memory:")
+    init_catalog(catalog, str(legacy))
+
+    assert not legacy.exists()
+    assert (tmp_path / "snapshots.json.migrated").exists()
+    assert get_snapshot(catalog, "old.db")["scope"] == "full"
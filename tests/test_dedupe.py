@@ -0,0 +1,63 @@
+import json
+import sqlite3
+
+from invokeai_presets_cli.dedupe import (
+    find_duplicate_clusters,
+    init_signature_cache,
+    minhash_signature,
+    prompt_shingles,
+    sync_signatures,
+)
+
+
+def add_preset(db, preset_id, name, positive, type="user"):
+    db.execute(
+        "INSERT INTO style_presets (id, name, preset_data, type, updated_at) "
+        "VALUES (?, ?, ?, ?, '2024-09-20 10:00:00.000')",
+        (
+            preset_id,
+            name,
+            json.dumps({"positive_prompt": positive, "negative_prompt": "blurry"}),
+            type,
+        ),
+    )
+
+
+def test_prompt_shingles_ignore_case_spacing_and_placeholder():
+    assert prompt_shingles("{prompt}, Film  grain", "") == prompt_shingles(
+        "film grain {prompt}", None
+    )
+    assert minhash_signature(prompt_shingles("", None)) is None
+
+
+def test_duplicate_clusters_use_cached_signatures(tmp_path):
+    live_path = str(tmp_path / "invokeai.db")
+    live = sqlite3.connect(live_path)
+    live.execute(
+        "CREATE TABLE style_presets (id TEXT PRIMARY KEY, name TEXT, preset_data TEXT, type TEXT, updated_at TEXT)"
+    )
+    prompt = "{prompt}, cinematic still, anamorphic lens, film grain, teal and orange, moody lighting"
+    add_preset(live, "1", "Cinematic", prompt, type="default")
+    add_preset(live, "2", "Cinematic (copy)", prompt.upper().replace(", ", " ,  "))
+    add_preset(live, "3", "Cinematic v2", prompt + ", dramatic shadows")
+    add_preset(live, "4", "Watercolor", "{prompt}, watercolor painting, soft wash")
+    live.commit()
+
+    cache = sqlite3.connect(str(tmp_path / "signatures.db"))
+    init_signature_cache(cache)
+    assert sync_signatures(cache, live_path) == (4, 0)
+    assert sync_signatures(cache, live_path) == (0, 0)
+
+    clusters = find_duplicate_clusters(cache, live_path, threshold=0.7)
+    assert [[m["id"] for m in members] for members in clusters] == [["1", "2", "3"]]
+    exact = find_duplicate_clusters(cache, live_path, threshold=1.0)
+    assert [[m["id"] for m in members] for members in exact] == [["1", "2"]]
+
+    live.execute("DELETE FROM style_presets WHERE id = '2'")
+    live.execute(
+        "UPDATE style_presets SET updated_at = '2024-09-21' , preset_data = "
+        "json_object('positive_prompt', 'pixel art') WHERE id = '3'"
+    )
+    live.commit()
+    assert sync_signatures(cache, live_path) == (1, 1)
+    assert find_duplicate_clusters(cache, live_path, threshold=0.7) == []
@@ -0,0 +1,516 @@
+import gzip
+import json
+import sqlite3
+import threading
+
+import pytest
+import typer
+
+from unittest.mock import patch
+
+from invokeai_presets_cli.hashes import record_hash
+from invokeai_presets_cli.validation import PresetRecord, validate_positions
+from invokeai_presets_cli.functions import (
+    apply_directory_sync,
+    apply_import_plan,
+    build_import_plan,
+    build_preset_index,
+    bulk_upsert_presets,
+    delete_staged_presets,
+    diff_presets,
+    get_presets_page,
+    page_label,
+    plan_directory_sync,
+    plan_preset_deletion,
+    preset_filter,
+    preset_key,
+    PresetChoices,
+    PresetPager,
+    restore_database_pages,
+    restore_presets_table,
+    restore_selected_presets,
+    snapshot_presets_table,
+    stage_preset_rows,
+    sync_presets,
+    write_presets_export,
+)
+
+
+@pytest.fixture
+def presets_db(tmp_path):
+    db_path = tmp_path / "invokeai.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("""
+    CREATE TABLE style_presets (
+        id TEXT NOT NULL PRIMARY KEY,
+        name TEXT NOT NULL,
+        preset_data TEXT NOT NULL,
+        type TEXT NOT NULL DEFAULT "user",
+        created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+        updated_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'))
+    );
+    CREATE INDEX idx_style_presets_name ON style_presets(name);
+    """)
+    conn.execute(
+        "INSERT INTO style_presets (id, name, preset_data, type) VALUES (?, ?, ?, ?)",
+        (
+            "existing-id",
+            "Existing",
+            json.dumps({"positive_prompt": "old", "negative_prompt": ""}),
+            "user",
+        ),
+    )
+    conn.commit()
+    with patch("invokeai_presets_cli.functions.DATABASE_PATH", str(db_path)):
+        yield conn
+    conn.close()
+
+
+def validated(source, presets):
+    return (source, *validate_positions(presets, source=source))
+
+
+def preset(name, positive="", negative="", type="user"):
+    return {
+        "name": name,
+        "type": type,
+        "preset_data": {"positive_prompt": positive, "negative_prompt": negative},
+    }
+
+
+def test_stage_preset_rows_shares_one_timestamp(presets_db):
+    existing = {("Existing", "user"): ("existing-id", "user")}
+    rows = stage_preset_rows(
+        [preset("Existing", "new")], [preset("A"), preset("B")], existing
+    )
+    assert len(rows) == 3
+    assert rows[0][0] == "existing-id"
+    assert len({row[4] for row in rows}) == 1
+    assert len({row[0] for row in rows}) == 3
+
+
+def test_bulk_upsert_presets_creates_and_updates(presets_db):
+    existing = {("Existing", "user"): ("existing-id", "user")}
+    rows = stage_preset_rows([preset("Existing", "new")], [preset("Fresh")], existing)
+    with presets_db:
+        assert bulk_upsert_presets(presets_db.cursor(), rows) == 2
+
+    stored = dict(presets_db.execute("SELECT name, preset_data FROM style_presets"))
+    assert len(stored) == 2
+    assert json.loads(stored["Existing"])["positive_prompt"] == "new"
+    assert "Fresh" in stored
+
+
+def test_build_preset_index_covers_every_row(presets_db, tmp_path):
+    rows = stage_preset_rows([], [preset(f"P{i}") for i in range(25)], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+
+    hashes_path = str(tmp_path / "preset_hashes.db")
+    with patch("invokeai_presets_cli.functions.PRESET_HASHES_PATH", hashes_path):
+        index = build_preset_index()
+        assert len(index) == 26
+        preset_id, type, digest = index["Existing", "user"]
+        assert preset_id == "existing-id"
+        assert type == "user"
+        assert digest == record_hash(PresetRecord("Existing", "user", "old", ""))
+        assert digest == build_preset_index()["Existing", "user"][2]
+
+
+def test_import_keeps_default_presets_with_the_same_name(presets_db, tmp_path):
+    presets_db.execute(
+        "INSERT INTO style_presets (id, name, preset_data, type) VALUES (?, ?, ?, ?)",
+        ("d1", "Cinematic", json.dumps({"positive_prompt": "film"}), "default"),
+    )
+    presets_db.commit()
+    plan_path = tmp_path / "plan.json"
+    with (
+        patch(
+            "invokeai_presets_cli.functions.PRESET_HASHES_PATH",
+            str(tmp_path / "preset_hashes.db"),
+        ),
+        patch("invokeai_presets_cli.functions.create_snapshot"),
+    ):
+        plan = build_import_plan(
+            [validated("gist.json", [{"name": "Cinematic", "prompt": "mine"}])]
+        )
+        assert plan["summary"]["create"] == 1 and plan["update"] == []
+        plan_path.write_text(json.dumps(plan))
+        apply_import_plan(str(plan_path))
+
+    stored = {
+        (name, type): (preset_id, json.loads(preset_data)["positive_prompt"])
+        for preset_id, name, type, preset_data in presets_db.execute(
+            "SELECT id, name, type, preset_data FROM style_presets "
+            "WHERE name = 'Cinematic'"
+        )
+    }
+    assert stored["Cinematic", "default"] == ("d1", "film")
+    assert stored["Cinematic", "user"][1] == "mine"
+
+
+def test_get_presets_page_walks_keyset_both_ways(presets_db):
+    rows = stage_preset_rows([], [preset(f"P{i:02d}") for i in range(12)], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+
+    condition = "WHERE type = 'user'"
+    first = get_presets_page(presets_db, condition, 5)
+    second = get_presets_page(presets_db, condition, 5, after=preset_key(first[-1]))
+    back = get_presets_page(presets_db, condition, 5, before=preset_key(second[0]))
+
+    assert [p[1] for p in first] == ["Existing", "P00", "P01", "P02", "P03"]
+    assert [p[1] for p in second] == ["P04", "P05", "P06", "P07", "P08"]
+    assert back == first
+
+
+def test_page_label_is_exact_only_on_page_boundaries():
+    assert page_label(0, 10, 10, 25) == "Page 1 of 3"
+    assert page_label(20, 5, 10, 25) == "Page 3 of 3"
+    # A --before cursor near the top shows a short page
+    assert page_label(0, 3, 10, 25) == "Presets 1-3 of 25"
+    assert page_label(3, 10, 10, 25) == "Presets 4-13 of 25"
+
+
+def test_preset_pager_prefetches_and_evicts(presets_db):
+    rows = stage_preset_rows([], [preset(f"P{i:02d}") for i in range(12)], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+
+    pager = PresetPager("WHERE type = 'user'", 3, cache_size=2)
+    try:
+        first, _ = pager.get(0, offset=0)
+        pager.prefetch(0, 13)
+        pager.pending[3].result()
+
+        second, _ = pager.get(3, after=preset_key(first[-1]))
+        assert [p[1] for p in second] == ["P02", "P03", "P04"]
+
+        pager.get(6, after=preset_key(second[-1]))
+        assert list(pager.pages) == [3, 6]
+    finally:
+        pager.close()
+
+
+def test_preset_pager_closes_its_worker_connection(presets_db):
+    closed_on = []
+    pager = PresetPager("", 3)
+    pager.get(0, offset=0)
+    with patch(
+        "invokeai_presets_cli.functions.close_connections",
+        side_effect=lambda: closed_on.append(threading.current_thread().name),
+    ):
+        pager.close()
+    assert len(closed_on) == 1 and closed_on[0].startswith("preset-pager")
+
+
+def test_presets_snapshot_round_trip(presets_db, tmp_path):
+    presets_db.execute("CREATE TABLE images (id TEXT)")
+    snapshot_path = str(tmp_path / "snapshot.db")
+    assert snapshot_presets_table(presets_db, snapshot_path) == 1
+
+    snapshot = sqlite3.connect(snapshot_path)
+    tables = {row[0] for row in snapshot.execute("SELECT name FROM sqlite_master")}
+    snapshot.close()
+    assert "images" not in tables
+    assert {"style_presets", "idx_style_presets_name", "snapshot_meta"} <= tables
+
+    with presets_db:
+        presets_db.execute("DELETE FROM style_presets")
+    assert restore_presets_table(presets_db, snapshot_path) == 1
+    assert presets_db.execute("SELECT id FROM style_presets").fetchall() == [
+        ("existing-id",)
+    ]
+
+
+def test_restore_database_pages_steps_into_live_db(presets_db, tmp_path):
+    snapshot_path = str(tmp_path / "full.db")
+    presets_db.execute("VACUUM INTO ?", (snapshot_path,))
+    with presets_db:
+        presets_db.execute("DELETE FROM style_presets")
+        presets_db.execute("CREATE TABLE images (id TEXT)")
+
+    steps = []
+    restore_database_pages(
+        presets_db, snapshot_path, pages=1, progress=lambda *step: steps.append(step)
+    )
+
+    assert len(steps) > 1
+    assert presets_db.execute("SELECT id FROM style_presets").fetchall() == [
+        ("existing-id",)
+    ]
+    tables = {row[0] for row in presets_db.execute("SELECT name FROM sqlite_master")}
+    assert "images" not in tables
+
+
+def test_diff_presets_reports_changed_fields(presets_db, tmp_path):
+    old_path = str(tmp_path / "old.db")
+    presets_db.execute("VACUUM INTO ?", (old_path,))
+    rows = stage_preset_rows(
+        [preset("Existing", "new")],
+        [preset("Fresh")],
+        {("Existing", "user"): ("existing-id",)},
+    )
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+    new_path = str(tmp_path / "new.db")
+    presets_db.execute("VACUUM INTO ?", (new_path,))
+
+    diff = diff_presets(old_path, new_path)
+    assert [p["name"] for p in diff["added"]] == ["Fresh"]
+    assert diff["modified"] == [
+        {
+            "id": "existing-id",
+            "name": "Existing",
+            "type": "user",
+            "changes": ["positive_prompt"],
+        }
+    ]
+    assert diff_presets(new_path, old_path)["removed"] == diff["added"]
+
+
+def test_restore_selected_presets_respects_conflict_policy(presets_db, tmp_path):
+    rows = stage_preset_rows([], [preset("Cinematic"), preset("Noir")], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+    snapshot_path = str(tmp_path / "snapshot.db")
+    presets_db.execute("VACUUM INTO ?", (snapshot_path,))
+    with presets_db:
+        presets_db.execute("DELETE FROM style_presets WHERE name = 'Noir'")
+        presets_db.execute(
+            "UPDATE style_presets SET preset_data = '{}' WHERE name = 'Cinematic'"
+        )
+
+    condition, params = preset_filter(match="*i*", alias="s")
+    assert restore_selected_presets(presets_db, snapshot_path, condition, params) == (
+        3,
+        1,
+    )
+    assert presets_db.execute(
+        "SELECT preset_data FROM style_presets WHERE name = 'Cinematic'"
+    ).fetchone() == ("{}",)
+
+    condition, params = preset_filter(names=["Cinematic"], alias="s")
+    assert restore_selected_presets(
+        presets_db, snapshot_path, condition, params, "replace"
+    ) == (1, 1)
+    assert presets_db.execute("SELECT COUNT(*) FROM style_presets").fetchone() == (3,)
+    assert presets_db.execute(
+        "SELECT preset_data FROM style_presets WHERE name = 'Cinematic'"
+    ).fetchone() != ("{}",)
+
+
+def test_preset_choices_pages_by_keyset(presets_db):
+    rows = stage_preset_rows([], [preset(f"P{i:02d}") for i in range(12)], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+
+    choices = PresetChoices("user")
+    assert choices.count("") == 13
+    first = choices.page("", 0, 5)
+    second = choices.page("", 1, 5)
+    assert first[0] == ("Existing (user)", "existing-id")
+    assert [label for label, _ in second] == [f"P{i:02d} (user)" for i in range(4, 9)]
+    assert choices.page_starts[2] is not None
+    assert len(choices.keys("")) == 13
+    # The type is a bound parameter, a quote in it is not SQL
+    assert PresetChoices("user' OR '1'='1").count("") == 0
+
+
+@pytest.mark.parametrize(
+    "filename", ["presets.json", "presets.json.gz", "presets.jsonl", "presets.jsonl.gz"]
+)
+def test_write_presets_export_streams_every_format(presets_db, tmp_path, filename):
+    rows = stage_preset_rows([], [preset("Fresh", "{prompt}, ünïcode")], {})
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+    expected = [
+        {"name": name, "type": type, "preset_data": json.loads(data)}
+        for name, type, data in presets_db.execute(
+            "SELECT name, type, preset_data FROM style_presets ORDER BY type, name, id"
+        )
+    ]
+
+    export_path = str(tmp_path / filename)
+    assert write_presets_export(presets_db, "", {}, export_path) == 2
+
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(export_path, "rt", encoding="utf-8") as f:
+        content = f.read()
+    if ".jsonl" in filename:
+        assert [json.loads(line) for line in content.splitlines()] == expected
+    else:
+        assert content == json.dumps(expected, indent=2)
+
+
+def test_filtered_export_is_built_by_sqlite(presets_db, tmp_path):
+    rows = stage_preset_rows(
+        [], [preset("Fooocus Sharp", "sharp"), preset("Fooocus Old", "old")], {}
+    )
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+        presets_db.execute(
+            "UPDATE style_presets SET updated_at = '2024-01-01 00:00:00' "
+            "WHERE name = 'Fooocus Old'"
+        )
+
+    condition, params = preset_filter(
+        preset_type="user", match="Fooocus*", since="2024-06-01"
+    )
+    export_path = str(tmp_path / "fooocus.json")
+    assert (
+        write_presets_export(presets_db, condition, params, export_path, pretty=False)
+        == 1
+    )
+    with open(export_path, encoding="utf-8") as f:
+        assert json.load(f) == [preset("Fooocus Sharp", "sharp")]
+
+
+def test_delete_staged_presets_joins_on_names(presets_db):
+    rows = stage_preset_rows(
+        [],
+        [preset(f"P{i:03d}") for i in range(200)] + [preset("P000", type="default")],
+        {},
+    )
+    with presets_db:
+        bulk_upsert_presets(presets_db.cursor(), rows)
+    targets = [f"P{i:03d}" for i in range(0, 200, 2)] * 2 + ["Missing"]
+
+    count, preview = plan_preset_deletion(presets_db, "name", targets)
+    assert count == 100
+    assert preview == [f"P{i:03d}" for i in range(0, 20, 2)]
+    assert presets_db.execute("SELECT COUNT(*) FROM style_presets").fetchone()[0] == 202
+
+    assert delete_staged_presets(presets_db, "name", targets) == 100
+    remaining = {
+        name
+        for (name,) in presets_db.execute(
+            "SELECT name FROM style_presets WHERE type = 'user'"
+        )
+    }
+    assert remaining == {"Existing"} | {f"P{i:03d}" for i in range(1, 200, 2)}
+    assert presets_db.execute(
+        "SELECT COUNT(*) FROM style_presets WHERE type = 'default'"
+    ).fetchone() == (1,)
+
+
+def test_import_plan_round_trip_and_refuses_stale_plans(presets_db, tmp_path):
+    sources = [
+        validated(
+            "gist.json",
+            [
+                {"name": "Existing", "positive_prompt": "new", "negative_prompt": ""},
+                {"name": "Fresh", "prompt": "fresh"},
+                {"name": "Broken", "preset_data": []},
+            ],
+        ),
+        validated("other.json", [{"name": "Fresh", "prompt": "again"}]),
+    ]
+    plan_path = tmp_path / "plan.json"
+    with (
+        patch(
+            "invokeai_presets_cli.functions.PRESET_HASHES_PATH",
+            str(tmp_path / "preset_hashes.db"),
+        ),
+        patch("invokeai_presets_cli.functions.create_snapshot"),
+    ):
+        plan = build_import_plan(sources)
+        assert plan["summary"] == {"create": 1, "update": 1, "noop": 0, "reject": 2}
+        assert plan["update"][0]["changes"] == {
+            "positive_prompt": {"old": "old", "new": "new"}
+        }
+        assert plan["reject"][1] == {
+            "path": "$[0].name",
+            "message": "duplicate of gist.json $[1]",
+            "name": "Fresh",
+            "source": "other.json",
+        }
+        plan_path.write_text(json.dumps(plan))
+
+        apply_import_plan(str(plan_path))
+        stored = dict(presets_db.execute("SELECT name, preset_data FROM style_presets"))
+        assert json.loads(stored["Existing"])["positive_prompt"] == "new"
+        assert json.loads(stored["Fresh"])["positive_prompt"] == "fresh"
+        assert build_import_plan(sources[:1])["summary"]["noop"] == 2
+
+        with pytest.raises(typer.Exit):
+            apply_import_plan(str(plan_path))
+    assert presets_db.execute("SELECT COUNT(*) FROM style_presets").fetchone() == (2,)
+
+
+def test_directory_sync_applies_minimal_changes(presets_db, tmp_path):
+    root = tmp_path / "presets"
+    root.mkdir()
+    (root / "a.json").write_text(
+        json.dumps(
+            [{"name": "Fresh", "prompt": "fresh"}, {"name": "Kept", "prompt": "k"}]
+        )
+    )
+    (root / "b.json").write_text(json.dumps({"name": "Fresh", "prompt": "twice"}))
+    with (
+        patch(
+            "invokeai_presets_cli.functions.PRESET_HASHES_PATH",
+            str(tmp_path / "preset_hashes.db"),
+        ),
+        patch(
+            "invokeai_presets_cli.functions.SYNC_SCAN_PATH",
+            str(tmp_path / "sync_scan.db"),
+        ),
+    ):
+        changes, errors, _ = plan_directory_sync(str(root))
+        assert [record.name for record in changes["create"]] == ["Fresh", "Kept"]
+        assert changes["delete"] == [("existing-id", "Existing")]
+        assert errors[0].source == "b.json" and errors[0].name == "Fresh"
+        assert apply_directory_sync(presets_db, changes, "user") == (2, 1)
+
+        (root / "a.json").write_text(
+            json.dumps(
+                [
+                    {"name": "Fresh", "prompt": "fresh"},
+                    {"name": "Kept", "prompt": "new"},
+                ]
+            )
+        )
+        changes, _, _ = plan_directory_sync(str(root))
+        assert [record.name for record in changes["update"]] == ["Kept"]
+        assert len(changes["noop"]) == 1 and changes["delete"] == []
+
+    names = {name for (name,) in presets_db.execute("SELECT name FROM style_presets")}
+    assert names == {"Fresh", "Kept"}
+
+
+def test_sync_refuses_default_presets(presets_db, tmp_path):
+    presets_db.execute(
+        "INSERT INTO style_presets (id, name, preset_data, type) VALUES (?, ?, ?, ?)",
+        ("d1", "Cinematic", json.dumps({"positive_prompt": "film"}), "default"),
+    )
+    presets_db.commit()
+    root = tmp_path / "presets"
+    root.mkdir()
+    (root / "a.json").write_text(json.dumps({"name": "Noir", "prompt": "noir"}))
+    with patch("invokeai_presets_cli.functions.plan_directory_sync") as plan_sync:
+        sync_presets(str(root), "default")
+    plan_sync.assert_not_called()
+    assert presets_db.execute(
+        "SELECT id FROM style_presets WHERE type = 'default'"
+    ).fetchall() == [("d1",)]
+
+
+def test_apply_import_plan_rejects_broken_and_foreign_plans(presets_db, tmp_path):
+    with patch(
+        "invokeai_presets_cli.functions.PRESET_HASHES_PATH",
+        str(tmp_path / "preset_hashes.db"),
+    ):
+        plan = build_import_plan(
+            [validated("gist.json", [{"name": "Fresh", "prompt": "f"}])]
+        )
+    plan_path = tmp_path / "plan.json"
+    broken = dict(plan, create=[{"name": "Fresh"}])
+    foreign = dict(plan, database=str(tmp_path / "other" / "invokeai.db"))
+    with patch("invokeai_presets_cli.functions.create_snapshot") as snapshot:
+        for bad_plan in (broken, foreign, {k: plan[k] for k in ("version", "create")}):
+            plan_path.write_text(json.dumps(bad_plan))
+            with pytest.raises(typer.Exit):
+                apply_import_plan(str(plan_path))
+    snapshot.assert_not_called()
+    assert presets_db.execute("SELECT COUNT(*) FROM style_presets").fetchone() == (1,)
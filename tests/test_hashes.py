@@ -0,0 +1,65 @@
+import json
+import sqlite3
+
+from invokeai_presets_cli.hashes import (
+    init_hash_cache,
+    load_preset_index,
+    record_hash,
+    sync_preset_hashes,
+)
+from invokeai_presets_cli.validation import PresetRecord
+
+
+def test_stored_and_incoming_hashes_agree_and_resync_only_changes(tmp_path):
+    live_path = str(tmp_path / "invokeai.db")
+    live = sqlite3.connect(live_path)
+    live.execute(
+        "CREATE TABLE style_presets (id TEXT PRIMARY KEY, name TEXT, preset_data TEXT, type TEXT, updated_at TEXT)"
+    )
+    tricky = 'Ünïcode "quotes" \\ back\nslash\t😀'
+    live.executemany(
+        "INSERT INTO style_presets VALUES (?, ?, ?, 'user', '2024-09-20')",
+        [
+            # Same content written with different spacing and key order
+            (
+                "1",
+                "Spaced",
+                json.dumps(
+                    {"negative_prompt": "", "positive_prompt": tricky}, indent=4
+                ),
+            ),
+            (
+                "2",
+                "Compact",
+                json.dumps({"positive_prompt": "noir"}, separators=(",", ":")),
+            ),
+        ],
+    )
+    live.commit()
+
+    cache = sqlite3.connect(str(tmp_path / "preset_hashes.db"))
+    init_hash_cache(cache)
+    assert sync_preset_hashes(cache, live_path) == (2, 0)
+    assert sync_preset_hashes(cache, live_path) == (0, 0)
+
+    index = load_preset_index(cache, live_path)
+    assert index["Spaced", "user"][2] == record_hash(
+        PresetRecord("Spaced", "user", tricky, "")
+    )
+    assert index["Compact", "user"][2] == record_hash(
+        PresetRecord("Compact", "user", "noir", "")
+    )
+    assert index["Compact", "user"][2] != record_hash(
+        PresetRecord("Compact", "project", "noir", "")
+    )
+
+    live.execute(
+        'UPDATE style_presets SET preset_data = \'{"positive_prompt": "film"}\', '
+        "updated_at = '2024-09-21' WHERE id = '2'"
+    )
+    live.execute("DELETE FROM style_presets WHERE id = '1'")
+    live.commit()
+    assert sync_preset_hashes(cache, live_path) == (1, 1)
+    assert load_preset_index(cache, live_path)["Compact", "user"][2] == record_hash(
+        PresetRecord("Compact", "user", "film", "")
+    )
@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+
+import pytest
+
+from invokeai_presets_cli.helpers import (
+    compress_file,
+    db_connection,
+    decompress_file,
+    shared_connection,
+)
+
+
+def test_db_connection_reuses_tuned_connection(tmp_path):
+    db_path = str(tmp_path / "invokeai.db")
+    with db_connection(db_path) as first, db_connection(db_path) as second:
+        assert first is second
+        assert first.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert first.execute("PRAGMA temp_store").fetchone()[0] == 2
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(shared_connection(db_path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+
+def test_db_connection_keeps_wal_and_rolls_back(tmp_path):
+    db_path = str(tmp_path / "wal.db")
+    setup = sqlite3.connect(db_path)
+    setup.execute("PRAGMA journal_mode = WAL")
+    setup.execute("CREATE TABLE t (x)")
+    setup.close()
+
+    try:
+        with db_connection(db_path) as db:
+            db.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    with db_connection(db_path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert db.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+@pytest.mark.parametrize("method, suffix", [("gzip", ".gz"), ("zstd", ".zst")])
+def test_compress_file_round_trip(tmp_path, method, suffix):
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    raw = tmp_path / "snapshot.db"
+    raw.write_bytes(b"SQLite format 3\x00" + b"\x00" * 64 * 1024)
+    packed = tmp_path / f"snapshot.db{suffix}"
+    restored = tmp_path / "restored.db"
+
+    assert compress_file(str(raw), str(packed), method) < raw.stat().st_size
+    decompress_file(str(packed), str(restored))
+    assert restored.read_bytes() == raw.read_bytes()
@@ -166,3 +166,19 @@ def test_invalid_option(runner):
         "root database list-snapshots [OPTIONS] Try 'root database list-snapshots"
         in simplified_output
     )
+
+
+def test_sync_rejects_watch_with_dry_run(runner, tmp_path):
+    with patch("invokeai_presets_cli.functions.watch_presets") as watch:
+        result = runner.invoke(
+            invoke_presets_cli, ["sync", str(tmp_path), "--watch", "--dry-run"]
+        )
+    assert result.exit_code == 2
+    watch.assert_not_called()
+
+
+def test_export_filters_without_output_fail(runner):
+    with patch("invokeai_presets_cli.functions.export_presets") as export:
+        result = runner.invoke(invoke_presets_cli, ["export", "--type", "user"])
+    assert result.exit_code == 2
+    export.assert_not_called()
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from invokeai_presets_cli.picker import ListChoices, pick
+
+
+def test_list_choices_ranks_prefix_substring_fuzzy():
+    choices = ListChoices(["Neon Noir", "Noir", "Cinematic", "Film Noir", "Nature"])
+    assert choices.matches("no") == [1, 0, 3]
+    assert choices.matches("nor") == [0, 1, 3]
+    assert choices.matches("noir") == [1, 0, 3]
+    assert choices.keys("") == {0, 1, 2, 3, 4}
+    assert choices.page("", 1, 2) == [("Cinematic", 2), ("Film Noir", 3)]
+
+
+def test_pick_keeps_selection_across_pages_and_searches():
+    choices = ListChoices([f"Preset {i:02d}" for i in range(30)])
+    checked = iter([{"page": [0, 1]}, {"page": [15]}, {"page": [22]}])
+    actions = iter(["Next page", "Search", "Done (4 selected)"])
+
+    with (
+        patch("inquirer.prompt", lambda questions: next(checked)),
+        patch("inquirer.list_input", lambda *args, **kwargs: next(actions)),
+        patch("inquirer.text", lambda *args, **kwargs: "22"),
+    ):
+        assert pick(choices, "Select presets") == {0, 1, 15, 22}
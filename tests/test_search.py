@@ -0,0 +1,59 @@
+import json
+import sqlite3
+
+from invokeai_presets_cli.search import (
+    fts_query,
+    init_search_index,
+    search_index,
+    sync_search_index,
+)
+
+
+def add_preset(db, preset_id, name, positive, updated_at="2024-09-20 10:00:00.000"):
+    db.execute(
+        "INSERT INTO style_presets (id, name, preset_data, type, updated_at) "
+        "VALUES (?, ?, ?, 'user', ?)",
+        (
+            preset_id,
+            name,
+            json.dumps({"positive_prompt": positive, "negative_prompt": "blurry"}),
+            updated_at,
+        ),
+    )
+
+
+def test_search_index_follows_live_changes(tmp_path):
+    live_path = str(tmp_path / "invokeai.db")
+    live = sqlite3.connect(live_path)
+    live.execute(
+        "CREATE TABLE style_presets (id TEXT PRIMARY KEY, name TEXT, preset_data TEXT, type TEXT, updated_at TEXT)"
+    )
+    add_preset(live, "1", "Cinematic", "{prompt}, film grain, anamorphic")
+    add_preset(live, "2", "Noir", "{prompt}, black and white")
+    live.commit()
+
+    index = sqlite3.connect(str(tmp_path / "search_index.db"))
+    init_search_index(index)
+    assert sync_search_index(index, live_path) == (2, 0)
+    assert sync_search_index(index, live_path) == (0, 0)
+
+    results = search_index(index, "anamor")
+    assert [r["name"] for r in results] == ["Cinematic"]
+    assert "\x02anamorphic\x03" in results[0]["snippet"]
+
+    live.execute(
+        "UPDATE style_presets SET name = 'Neon Noir', updated_at = '2024-09-21' WHERE id = '2'"
+    )
+    live.execute("DELETE FROM style_presets WHERE id = '1'")
+    add_preset(live, "3", "Retro", "{prompt}, synthwave")
+    live.commit()
+
+    assert sync_search_index(index, live_path) == (2, 1)
+    assert search_index(index, "anamorphic") == []
+    assert [r["name"] for r in search_index(index, "neon")] == ["Neon Noir"]
+    assert [r["id"] for r in search_index(index, "synth")] == ["3"]
+
+
+def test_fts_query_quotes_words():
+    assert fts_query('sci-fi "noir') == '"sci"* "fi"* "noir"*'
+    assert fts_query("  ") == ""
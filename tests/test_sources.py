@@ -0,0 +1,164 @@
+import json
+import threading
+
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from invokeai_presets_cli.functions import fetch_validated_sources, parse_presets_source
+from invokeai_presets_cli.sources import ResponseCache, fetch_sources, read_manifest
+from invokeai_presets_cli.validation import validate_presets
+
+PRESETS = [
+    {"name": "Cinematic", "prompt": "{prompt}, cinematic"},
+    {"name": "Noir", "positive_prompt": "{prompt}, noir", "negative_prompt": "color"},
+]
+
+
+class PresetHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        PresetHandler.hits[self.path] = PresetHandler.hits.get(self.path, 0) + 1
+        if self.path == "/flaky.json" and PresetHandler.hits[self.path] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == "/etag.json":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(PRESETS).encode()
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/broken.json":
+            body = b"[{"
+        elif self.path == "/missing.json":
+            self.send_response(404)
+            self.end_headers()
+            return
+        else:
+            body = json.dumps(PRESETS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def preset_server():
+    PresetHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PresetHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_sources_keeps_order_and_reports_errors(preset_server):
+    urls = [
+        f"{preset_server}/a.json",
+        f"{preset_server}/broken.json",
+        f"{preset_server}/missing.json",
+        f"{preset_server}/flaky.json",
+    ]
+    results = fetch_sources(urls, parse_presets_source)
+
+    assert [result["url"] for result in results] == urls
+    assert len(results[0]["data"]) == 2
+    records, errors = validate_presets(results[0]["data"])
+    assert records[0].positive_prompt == "{prompt}, cinematic"
+    assert errors == []
+    assert "Error parsing JSON" in results[1]["error"]
+    assert "404" in results[2]["error"]
+    assert results[3]["error"] is None
+    assert PresetHandler.hits["/flaky.json"] == 2
+
+
+def test_read_manifest_skips_comments(tmp_path):
+    manifest = tmp_path / "sources.txt"
+    manifest.write_text(
+        "# gists\nhttps://a.example/x.json\n\nhttps://b.example/y.json\n"
+    )
+    assert read_manifest(str(manifest)) == [
+        "https://a.example/x.json",
+        "https://b.example/y.json",
+    ]
+
+
+def test_fetch_sources_revalidates_with_etag(preset_server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache" / "http_cache.db"))
+    url = f"{preset_server}/etag.json"
+    parse_calls = []
+
+    def parse(content):
+        parse_calls.append(content)
+        return parse_presets_source(content)
+
+    first = fetch_sources([url], parse, cache, "presets:test")[0]
+    second = fetch_sources([url], parse, cache, "presets:test")[0]
+    reparsed = fetch_sources([url], parse, cache, "presets:other")[0]
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["data"] == first["data"]
+    assert reparsed["cached"] is True
+    assert len(parse_calls) == 2
+    cache.close()
+
+
+def test_response_cache_evicts_by_size(tmp_path):
+    cache = ResponseCache(str(tmp_path / "http_cache.db"), max_bytes=10)
+    with cache.db:
+        cache.db.execute(
+            "INSERT INTO responses VALUES ('u', '\"e\"', NULL, '0123456789abc', NULL, NULL, 13, 0, 0)"
+        )
+    cache.max_age = float("inf")
+    assert cache.evict() == 1
+    assert cache.get("u") is None
+    cache.close()
+
+
+def test_fetch_validated_sources_skips_validation_on_304(preset_server, tmp_path):
+    url = f"{preset_server}/etag.json"
+    cache_path = str(tmp_path / "cache" / "http_cache.db")
+    with patch("invokeai_presets_cli.functions.HTTP_CACHE_PATH", cache_path):
+        first = fetch_validated_sources([url])[0]
+        with patch(
+            "invokeai_presets_cli.functions.validate_positions",
+            side_effect=AssertionError("validated again"),
+        ):
+            second = fetch_validated_sources([url])[0]
+
+    assert second["cached"] is True
+    assert second["data"] == first["data"]
+    source, records, errors = second["data"]
+    assert source == url and errors == []
+    assert records[0][1].positive_prompt == "{prompt}, cinematic"
+
+
+def test_fetch_sources_reports_malformed_urls_per_source(preset_server):
+    urls = [
+        "http://[::1",
+        f"{preset_server}/a.json",
+        "https://gist.github.com:80a/x",
+        f"{preset_server}/a.json\n",
+    ]
+    results = fetch_sources(urls, parse_presets_source)
+
+    assert [result["url"] for result in results] == urls
+    assert results[0]["error"].startswith("Invalid URL")
+    assert results[1]["error"] is None and len(results[1]["data"]) == 2
+    assert results[2]["error"].startswith("Invalid URL")
+    assert results[3]["error"].startswith("Invalid URL")
@@ -0,0 +1,29 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(*args):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "invokeai_presets_cli", *args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+    )
+    return {
+        line.split("|")[-1].strip()
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.mark.parametrize("args", [["--help"], ["about", "--version"]])
+def test_startup_skips_database_and_prompt_modules(args):
+    modules = imported_modules(*args)
+    assert "invokeai_presets_cli.cli" in modules
+    for module in ["invokeai_presets_cli.functions", "inquirer", "httpx", "dotenv"]:
+        assert module not in modules
@@ -0,0 +1,37 @@
+import json
+import os
+import sqlite3
+
+from invokeai_presets_cli.sync import init_scan_cache, scan_directory
+
+
+def test_scan_directory_only_parses_changed_files(tmp_path):
+    root = tmp_path / "presets"
+    (root / "nested").mkdir(parents=True)
+    (root / ".git").mkdir()
+    (root / ".git" / "ignored.json").write_text("[")
+    (root / "a.json").write_text(json.dumps([{"name": "A", "prompt": "a"}]))
+    (root / "nested" / "b.json").write_text(
+        json.dumps({"name": "B", "positive_prompt": "b"})
+    )
+    cache = sqlite3.connect(str(tmp_path / "sync_scan.db"))
+    init_scan_cache(cache)
+
+    scanned, stats = scan_directory(cache, str(root))
+    assert [path for path, _, _ in scanned] == [
+        "a.json",
+        os.path.join("nested", "b.json"),
+    ]
+    assert [records[0].name for _, records, _ in scanned] == ["A", "B"]
+    assert stats == {"files": 2, "hashed": 2, "parsed": 2, "removed": 0}
+
+    # Touched but identical, edited, and removed files
+    os.utime(root / "a.json", ns=(0, 0))
+    (root / "nested" / "b.json").write_text("[{")
+    _, stats = scan_directory(cache, str(root))
+    assert stats == {"files": 2, "hashed": 2, "parsed": 1, "removed": 0}
+    (root / "a.json").unlink()
+    scanned, stats = scan_directory(cache, str(root))
+    assert stats == {"files": 1, "hashed": 0, "parsed": 0, "removed": 1}
+    assert scanned[0][1] == []
+    assert scanned[0][2][0].message.startswith("invalid JSON")
@@ -0,0 +1,45 @@
+import copy
+import time
+
+from invokeai_presets_cli.validation import PresetError, PresetRecord, validate_presets
+
+
+def test_validate_presets_normalises_both_layouts_without_mutating():
+    presets = [
+        {"name": "Flat", "prompt": "{prompt}, flat"},
+        {"name": "Nested", "type": "default", "preset_data": {"prompt": "nested"}},
+        "not a preset",
+        {"name": "", "positive_prompt": "x"},
+        {"name": "Broken", "preset_data": {"negative_prompt": 3}},
+        {"name": "Nothing"},
+        {"name": "Odd type", "type": "shared", "preset_data": {}},
+        {"name": "Flat", "positive_prompt": "again"},
+    ]
+    original = copy.deepcopy(presets)
+
+    records, errors = validate_presets(presets, project_type=True)
+
+    assert presets == original
+    assert records == [
+        PresetRecord("Flat", "project", "{prompt}, flat", ""),
+        PresetRecord("Nested", "default", "nested", ""),
+    ]
+    assert errors == [
+        PresetError("$[2]", "expected an object"),
+        PresetError("$[3].name", "expected a non-empty string"),
+        PresetError("$[4].preset_data.negative_prompt", "expected a string", "Broken"),
+        PresetError("$[5]", "missing preset_data or positive_prompt", "Nothing"),
+        PresetError("$[6].type", "expected one of user, project, default", "Odd type"),
+        PresetError("$[7].name", "duplicate of $[0]", "Flat"),
+    ]
+
+
+def test_validate_presets_handles_large_sources():
+    presets = [
+        {"name": f"Preset {i}", "positive_prompt": "{prompt}, detailed"}
+        for i in range(100_000)
+    ]
+    start = time.perf_counter()
+    records, errors = validate_presets(presets)
+    assert time.perf_counter() - start < 1.0
+    assert len(records) == 100_000 and errors == []
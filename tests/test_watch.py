@@ -0,0 +1,67 @@
+import os
+import sqlite3
+
+import pytest
+
+from unittest.mock import MagicMock, patch
+
+from invokeai_presets_cli.functions import watch_presets
+from invokeai_presets_cli.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    collect_changes,
+)
+
+
+def open_inotify(root):
+    try:
+        return InotifyWatcher(root)
+    except OSError:
+        pytest.skip("inotify is not available")
+
+
+@pytest.mark.parametrize("open_watcher", [open_inotify, PollingWatcher])
+def test_watcher_reports_touched_preset_files(tmp_path, open_watcher):
+    root = tmp_path / "presets"
+    root.mkdir()
+    (root / "a.json").write_text("[]")
+    watcher = open_watcher(str(root))
+    try:
+        assert collect_changes(watcher, timeout=0.05) == set()
+
+        (root / "a.json").write_text('[{"name": "A", "prompt": "a"}]')
+        (root / "notes.txt").write_text("ignored")
+        (root / "nested").mkdir()
+        (root / "nested" / "b.json").write_text("[]")
+        changes = collect_changes(watcher, timeout=1.0, debounce=0.6, max_delay=1.5)
+        assert changes == {"a.json", os.path.join("nested", "b.json")}
+
+        (root / "a.json").unlink()
+        assert collect_changes(watcher, timeout=1.0) == {"a.json"}
+    finally:
+        watcher.close()
+
+
+def test_watch_presets_survives_a_failed_batch(tmp_path):
+    plan = {"create": [], "update": [], "delete": [], "noop": []}
+    stats = {"files": 1}
+    with (
+        patch("invokeai_presets_cli.functions.sync_presets"),
+        patch("invokeai_presets_cli.watch.open_watcher", return_value=MagicMock()),
+        patch(
+            "invokeai_presets_cli.watch.collect_changes",
+            side_effect=[{"a.json"}, set(), KeyboardInterrupt],
+        ),
+        patch(
+            "invokeai_presets_cli.functions.plan_directory_sync",
+            side_effect=[
+                sqlite3.OperationalError("database is locked"),
+                (plan, [], stats),
+            ],
+        ) as plan_sync,
+    ):
+        watch_presets(str(tmp_path))
+
+    # The batch after the failure rescans the whole tree
+    assert plan_sync.call_args_list[0].args[2] == {"a.json"}
+    assert plan_sync.call_args_list[1].args[2] is None